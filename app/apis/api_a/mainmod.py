@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from .submod import rand_gen
+from typing import Sequence
+
+from .submod import rand_gen, rand_gen_batch
 
 
 def main_func(num: int) -> dict[str, int]:
     d = rand_gen(num)
     return d
+
+
+def main_func_batch(nums: Sequence[int]) -> list[dict[str, int]]:
+    return rand_gen_batch(nums)
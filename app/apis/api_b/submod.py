@@ -4,13 +4,33 @@
 from __future__ import annotations
 
 import random
+from typing import Optional, Sequence
 
+import numpy as np
 
-def rand_gen(num: int) -> dict[str, int]:
+
+def rand_gen(num: int, rng: Optional[np.random.Generator] = None) -> dict[str, int]:
     num = int(num)
+    if rng is None:
+        random_first, random_second = random.randint(0, num), random.randint(0, num)
+    else:
+        random_first = int(rng.integers(0, num, endpoint=True))
+        random_second = int(rng.integers(0, num, endpoint=True))
     d = {
         'seed': num,
-        'random_first': random.randint(0, num),
-        'random_second': random.randint(0, num),
+        'random_first': random_first,
+        'random_second': random_second,
     }
     return d
+
+
+def rand_gen_batch(nums: Sequence[int], rng: Optional[np.random.Generator] = None) -> list[dict[str, int]]:
+    # One vectorized draw for all seeds. Draws are laid out row by row, so with the same
+    # generator the result equals calling `rand_gen(num, rng)` for each num in order.
+    rng = rng if rng is not None else np.random.default_rng()
+    seeds = np.asarray(nums, dtype=np.int64)
+    draws = rng.integers(0, seeds[:, None], size=(len(seeds), 2), endpoint=True)
+    return [
+        {'seed': seed, 'random_first': first, 'random_second': second}
+        for seed, (first, second) in zip(seeds.tolist(), draws.tolist())
+    ]
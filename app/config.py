@@ -1,11 +1,33 @@
 # app/config.py
 
 
+from typing import Optional
+
 from pydantic import BaseSettings, Field
 
 
 class Settings(BaseSettings):
     db_url: str = Field(..., env='DATABASE_URL')
+    # Defaults to `db_url` with its async driver (asyncpg for Postgres, aiosqlite for SQLite).
+    db_async_url: Optional[str] = Field(None, env='ASYNC_DATABASE_URL')
+    db_echo: bool = Field(False, env='DB_ECHO')
+    # Pool sizing only applies to pooled drivers; SQLite files keep SQLAlchemy's NullPool.
+    db_pool_size: int = Field(5, env='DB_POOL_SIZE')
+    db_max_overflow: int = Field(10, env='DB_MAX_OVERFLOW')
+    db_pool_timeout: float = Field(30, env='DB_POOL_TIMEOUT')
+    db_pool_recycle: int = Field(1800, env='DB_POOL_RECYCLE')
+    db_pool_pre_ping: bool = Field(True, env='DB_POOL_PRE_PING')
+    # Skip `create_all` on startup when the stored schema fingerprint matches the models.
+    db_skip_unchanged_schema: bool = Field(False, env='DB_SKIP_UNCHANGED_SCHEMA')
+
+    # Rows per multi-row INSERT in POST /tasks/bulk.
+    task_bulk_chunk_size: int = Field(1000, env='TASK_BULK_CHUNK_SIZE')
+
+    # Rows fetched per round trip while streaming GET /tasks/stream.
+    task_stream_batch_size: int = Field(1000, env='TASK_STREAM_BATCH_SIZE')
+
+    class Config:
+        env_file = '.env'
 
 
 settings = Settings()
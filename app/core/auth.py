@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from typing import Any, Optional, Union
@@ -9,9 +13,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
 
 # from jwt import PyJWTError #TODO: fix this (1)
-from app.core import config
+from app.core import config, users
+from app.core.cache import LRUCache
+from app.core.users import User, UserInDB  # noqa: F401
 
 
 class Token(BaseModel):
@@ -23,49 +30,64 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
-class User(BaseModel):
-    username: str
-    disabled: Optional[bool] = None
-
-
-class UserInDB(User):
-    hashed_password: str
-
-
 pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/token')
 router = APIRouter()
 
+# bcrypt is deliberately slow, so it runs on its own bounded pool instead of the event loop.
+password_executor = ThreadPoolExecutor(
+    max_workers=config.API_PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash',
+)
+password_slots = threading.BoundedSemaphore(
+    config.API_PASSWORD_HASH_WORKERS + config.API_PASSWORD_HASH_QUEUE_SIZE
+)
+
+# Usernames of already verified tokens, keyed by the token digest and expiring at the
+# token's `exp`. The user itself is resolved through `users.user_cache` on every call.
+token_cache: LRUCache[str] = LRUCache(maxsize=config.API_TOKEN_CACHE_SIZE)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    if not password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Too many concurrent logins, retry later',
+            headers={'Retry-After': '1'},
+        )
+    try:
+        future = password_executor.submit(verify_password, plain_password, hashed_password)
+    except RuntimeError:
+        password_slots.release()
+        raise
+    # The slot is held until bcrypt actually finishes, even if the request is cancelled.
+    future.add_done_callback(lambda _: password_slots.release())
+    return await asyncio.wrap_future(future)
 
 
-fake_users_db = {
-    'ubuntu': {
-        'username': config.API_USERNAME,
-        'hashed_password': get_password_hash(config.API_PASSWORD),
-    }
-}
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
 
 
-def get_user(db: dict[str, dict[str, str]], username: Optional[str],) -> UserInDB:
-    if username in db:
-        user_dict = db[username]
-        return UserInDB(**user_dict)
+def ensure_default_user() -> None:
+    # Only hashes the configured password when the account does not exist yet.
+    if users.get_user(config.API_USERNAME) is None:
+        hashed_password = config.API_PASSWORD_HASH or get_password_hash(config.API_PASSWORD)
+        try:
+            users.create_user(config.API_USERNAME, hashed_password)
+        except IntegrityError:
+            # Another worker starting at the same time created it first.
+            pass
 
 
-def authenticate_user(
-    fake_db: dict[str, dict[str, str]], username: str, password: str,
-) -> Union[bool, UserInDB]:
-    user = get_user(fake_db, username)
-    if not user:
+async def authenticate_user(username: str, password: str) -> Union[bool, UserInDB]:
+    user = await users.get_user_async(username)
+    if not user or user.disabled:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
@@ -81,26 +103,36 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> bytes:
     return encoded_jwt
 
 
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
-    try:
-        payload = jwt.decode(token, config.API_SECRET_KEY, algorithms=[config.API_ALGORITHM],)
-        username = payload.get('sub')
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except Exception:
-        raise ValueError
-    # TODO: fix this (1)
-    # except jwt.PyJWTError as e:
-    #     raise credentials_exception
-    user = get_user(fake_users_db, username=token_data.username)
-
-    if user is None:
+    digest = token_digest(token)
+    username = token_cache.get(digest)
+    if username is None:
+        try:
+            payload = jwt.decode(token, config.API_SECRET_KEY, algorithms=[config.API_ALGORITHM],)
+            username = payload.get('sub')
+            if username is None:
+                raise credentials_exception
+            token_data = TokenData(username=username)
+        except Exception:
+            raise ValueError
+        # TODO: fix this (1)
+        # except jwt.PyJWTError as e:
+        #     raise credentials_exception
+        username = token_data.username
+        if 'exp' in payload:
+            token_cache.set(digest, username, expires_at=payload['exp'])
+
+    user = await users.get_user_async(username)
+    if user is None or user.disabled:
         raise credentials_exception
     return user
 
@@ -109,7 +141,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> dict[str, Any]:
-    user = authenticate_user(fake_users_db, form_data.username, form_data.password,)
+    user = await authenticate_user(form_data.username, form_data.password,)
     if not user:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
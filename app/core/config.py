@@ -6,7 +6,10 @@ load_dotenv('./.env')
 
 
 API_USERNAME = os.environ['API_USERNAME']
-API_PASSWORD = os.environ['API_PASSWORD']
+# A bcrypt hash of the API password. When it is set the plain password is optional and
+# no hashing happens at startup.
+API_PASSWORD_HASH = os.environ.get('API_PASSWORD_HASH')
+API_PASSWORD = os.environ.get('API_PASSWORD') if API_PASSWORD_HASH else os.environ['API_PASSWORD']
 
 # Auth configs.
 API_SECRET_KEY = os.environ['API_SECRET_KEY']
@@ -14,3 +17,16 @@ API_ALGORITHM = os.environ['API_ALGORITHM']
 API_ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.environ['API_ACCESS_TOKEN_EXPIRE_MINUTES']
 )  # infinity
+
+# Number of verified tokens kept in memory by `get_current_user`.
+API_TOKEN_CACHE_SIZE = int(os.environ.get('API_TOKEN_CACHE_SIZE', '1024'))
+
+# Password verification runs on a dedicated pool so bcrypt never blocks the event loop.
+# Logins beyond `workers + queue size` in flight are rejected with 503.
+API_PASSWORD_HASH_WORKERS = int(os.environ.get('API_PASSWORD_HASH_WORKERS', '2'))
+API_PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('API_PASSWORD_HASH_QUEUE_SIZE', '8'))
+
+# Read-through cache in front of the user table. The TTL bounds how long another
+# worker can serve a stale user after an update or disable.
+API_USER_CACHE_SIZE = int(os.environ.get('API_USER_CACHE_SIZE', '4096'))
+API_USER_CACHE_TTL_SECONDS = int(os.environ.get('API_USER_CACHE_TTL_SECONDS', '60'))
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+UNMATCHED_ROUTE = '<unmatched>'
+
+Collector = Callable[[], Iterable[Tuple[str, str, str, Dict[str, float]]]]
+
+
+def format_labels(names: tuple[str, ...], values: tuple[Any, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[tuple[Any, ...], float] = {}
+
+    def inc(self, labels: tuple[Any, ...] = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f'{self.name}{format_labels(self.labelnames, labels)} {value}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, labels: tuple[Any, ...] = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), then sum.
+        self.values: dict[tuple[Any, ...], list[float]] = {}
+
+    def observe(self, value: float, labels: tuple[Any, ...] = ()) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                yield f'{self.name}_bucket{format_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{format_labels(self.labelnames, labels)} {series[-1]}'
+            yield f'{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}'
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text exposition format.
+
+    Collectors are callables yielding `(name, documentation, label, {label_value: value})`
+    gauges that are read at scrape time, e.g. cache and pool statistics.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: list[Any] = []
+        self.collectors: list[Collector] = []
+
+    def register(self, metric: Any) -> Any:
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        for collector in self.collectors:
+            for name, documentation, label, values in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} gauge')
+                lines.extend(f'{name}{{{label}="{key}"}} {value}' for key, value in values.items())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+requests_total = registry.register(
+    Counter('http_requests_total', 'Total HTTP requests.', ('method', 'route', 'status'))
+)
+request_duration = registry.register(
+    Histogram('http_request_duration_seconds', 'HTTP request latency.', ('method', 'route'))
+)
+response_size = registry.register(
+    Histogram('http_response_size_bytes', 'HTTP response body size.', ('method', 'route'), SIZE_BUCKETS)
+)
+requests_in_flight = registry.register(Gauge('http_requests_in_flight', 'HTTP requests being served.', ('method',)))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route counts, latency, response size and in-flight requests.
+
+    Routes are labelled with their path template (`/api_a/{num}`), looked up from the
+    endpoint the router stored in the scope, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.route_paths: Optional[dict[Any, str]] = None
+
+    def route_label(self, scope: Scope) -> str:
+        if self.route_paths is None:
+            self.route_paths = {}
+            for route in scope['app'].routes:
+                self.route_paths.setdefault(getattr(route, 'endpoint', None), route.path)
+        return self.route_paths.get(scope.get('endpoint'), UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        requests_in_flight.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec((method,))
+            route = self.route_label(scope)
+            requests_total.inc((method, route, status))
+            request_duration.observe(elapsed, (method, route))
+            response_size.observe(size, (method, route))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core import config
+from app.core.cache import LRUCache
+from app.db import engine
+from app.models import UserAccount
+
+
+class User(BaseModel):
+    username: str
+    disabled: Optional[bool] = None
+
+
+class UserInDB(User):
+    hashed_password: str
+
+
+# Read-through cache so `get_user` rarely needs a DB round trip. Every write below
+# drops the affected entry; other workers catch up after API_USER_CACHE_TTL_SECONDS.
+user_cache: LRUCache[UserInDB] = LRUCache(maxsize=config.API_USER_CACHE_SIZE)
+
+
+def get_cached_user(username: str) -> Optional[UserInDB]:
+    return user_cache.get(username)
+
+
+def load_user(username: str) -> Optional[UserInDB]:
+    with Session(engine) as session:
+        account = session.exec(select(UserAccount).where(UserAccount.username == username)).first()
+    if account is None:
+        return None
+    user = UserInDB(username=account.username, disabled=account.disabled, hashed_password=account.hashed_password)
+    user_cache.set(username, user, expires_at=time.time() + config.API_USER_CACHE_TTL_SECONDS)
+    return user
+
+
+def get_user(username: Optional[str]) -> Optional[UserInDB]:
+    if username is None:
+        return None
+    return get_cached_user(username) or load_user(username)
+
+
+async def get_user_async(username: Optional[str]) -> Optional[UserInDB]:
+    if username is None:
+        return None
+    return get_cached_user(username) or await run_in_threadpool(load_user, username)
+
+
+def create_user(username: str, hashed_password: str, disabled: bool = False) -> UserAccount:
+    with Session(engine) as session:
+        account = UserAccount(username=username, hashed_password=hashed_password, disabled=disabled)
+        session.add(account)
+        session.commit()
+        session.refresh(account)
+    user_cache.pop(username)
+    return account
+
+
+def update_user(username: str, **fields: Any) -> Optional[UserAccount]:
+    with Session(engine) as session:
+        account = session.exec(select(UserAccount).where(UserAccount.username == username)).first()
+        if account is None:
+            return None
+        for key, value in fields.items():
+            setattr(account, key, value)
+        session.add(account)
+        session.commit()
+        session.refresh(account)
+    user_cache.pop(username)
+    user_cache.pop(account.username)
+    return account
+
+
+def disable_user(username: str) -> Optional[UserAccount]:
+    return update_user(username, disabled=True)
@@ -1,14 +1,166 @@
-import os
-from sqlmodel import create_engine, SQLModel, Session
+import hashlib
+import threading
+import time
+from typing import Any, Optional
 
-DATABASE_URL = os.environ.get('DATABASE_URL')
-engine = create_engine(DATABASE_URL, echo=True)
+from sqlalchemy import delete, event, insert, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+
+def async_database_url(url: str) -> str:
+    scheme, separator, rest = url.partition('://')
+    return ASYNC_DRIVERS.get(scheme.split('+')[0], scheme) + separator + rest
+
+
+DATABASE_URL = settings.db_url
+ASYNC_DATABASE_URL = settings.db_async_url or async_database_url(DATABASE_URL)
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        'echo': settings.db_echo,
+        'pool_pre_ping': settings.db_pool_pre_ping,
+        'pool_recycle': settings.db_pool_recycle,
+    }
+    if url.startswith('sqlite'):
+        # Sync sessions (e.g. user lookups) may be closed on a different threadpool thread.
+        options['connect_args'] = {'check_same_thread': False}
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+class PoolMetrics:
+    """Connection pool counters for sizing pools per replica.
+
+    Checkout and checkin are tracked through pool events. With `track_wait`, the wait
+    time is how long `get_async_session` spent acquiring a connection; pools without
+    a session dependency to time it leave the wait stats out.
+    """
+
+    def __init__(self, engine: Engine, track_wait: bool = False) -> None:
+        self.engine = engine
+        self.track_wait = track_wait
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+
+    def _on_connect(self, *args: Any) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def _on_checkout(self, *args: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def _on_checkin(self, *args: Any) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        size = pool.size() if hasattr(pool, 'size') else None
+        idle = pool.checkedin() if hasattr(pool, 'checkedin') else 0
+        overflow = max(pool.overflow(), 0) if hasattr(pool, 'overflow') else 0
+        snapshot = {
+            'pool': type(pool).__name__,
+            'size': size,
+            'checked_out': self.checked_out,
+            'idle': idle,
+            'overflow': overflow,
+            'connections_created': self.connections_created,
+            'checkouts': self.checkouts,
+        }
+        if self.track_wait:
+            snapshot.update(
+                wait_count=self.wait_count,
+                wait_seconds_total=self.wait_seconds_total,
+                wait_seconds_max=self.wait_seconds_max,
+            )
+        return snapshot
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+pool_metrics = PoolMetrics(engine)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+async_pool_metrics = PoolMetrics(async_engine.sync_engine, track_wait=True)
+
+
+class SchemaFingerprint(SQLModel, table=True):
+    __tablename__ = 'schema_fingerprint'
+
+    fingerprint: str = Field(primary_key=True)
+
+
+def schema_fingerprint() -> str:
+    statements = []
+    for table in SQLModel.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        statements.extend(str(CreateIndex(index).compile(dialect=engine.dialect)) for index in table.indexes)
+    return hashlib.sha256('\n'.join(statements).encode()).hexdigest()
+
+
+def stored_schema_fingerprint() -> Optional[str]:
+    try:
+        with Session(engine) as session:
+            return session.exec(select(SchemaFingerprint.fingerprint)).first()
+    except DBAPIError:
+        # The fingerprint table does not exist yet.
+        return None
 
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    if not settings.db_skip_unchanged_schema:
+        SQLModel.metadata.create_all(engine)
+        return
+
+    fingerprint = schema_fingerprint()
+    if stored_schema_fingerprint() == fingerprint:
+        return
+    try:
+        with engine.begin() as connection:
+            if connection.dialect.name == 'postgresql':
+                # Workers starting together would otherwise race on the DDL and the fingerprint row.
+                connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('create_db_and_tables'))"))
+            SQLModel.metadata.create_all(connection)
+            connection.execute(delete(SchemaFingerprint))
+            connection.execute(insert(SchemaFingerprint).values(fingerprint=fingerprint))
+    except IntegrityError:
+        # Another worker stored the fingerprint after our DELETE, e.g. without the lock on SQLite.
+        pass
 
 
-def get_session():
-    with Session(engine) as session:
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        start = time.perf_counter()
+        await session.connection()
+        async_pool_metrics.observe_wait(time.perf_counter() - start)
         yield session
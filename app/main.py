@@ -1,13 +1,15 @@
-from fastapi import Depends, FastAPI
-from sqlmodel import Session
+from fastapi import Depends, FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.middleware.cors import CORSMiddleware
 
 from app.core import auth
-from app.db import create_db_and_tables, get_session
+from app.core.metrics import MetricsMiddleware, registry
+from app.db import async_engine, create_db_and_tables, get_async_session
 from app.models import Task, TaskCreate
-from app.routes import views
+from app.routes import internal, tasks, views
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Set all CORS enabled origins
 app.add_middleware(
@@ -17,14 +19,30 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*'],
 )
+# Outermost, so it also sees requests answered by the CORS middleware.
+app.add_middleware(MetricsMiddleware)
+registry.register_collector(internal.runtime_gauges)
 
 app.include_router(auth.router)
 app.include_router(views.router)
+app.include_router(tasks.router)
+app.include_router(internal.router)
 
 
 @app.on_event('startup')
 def on_startup():
     create_db_and_tables()
+    auth.ensure_default_user()
+
+
+@app.on_event('shutdown')
+async def on_shutdown():
+    await async_engine.dispose()
+
+
+@app.get('/metrics', include_in_schema=False)
+def metrics() -> Response:
+    return Response(registry.render(), media_type='text/plain; version=0.0.4')
 
 
 @app.get('/ping')
@@ -33,9 +51,9 @@ def pong():
 
 
 @app.post('/task/', response_model=Task)
-def create_task(task: TaskCreate, session: Session = Depends(get_session)):
+async def create_task(task: TaskCreate, session: AsyncSession = Depends(get_async_session)):
     db_task = Task.from_orm(task)
     session.add(db_task)
-    session.commit()
-    session.refresh(db_task)
+    await session.commit()
+    await session.refresh(db_task)
     return db_task
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from sqlmodel import Field, SQLModel
 
 
@@ -11,3 +13,25 @@ class Task(TaskBase, table=True):
 
 class TaskCreate(TaskBase):
     pass
+
+
+class UserAccountBase(SQLModel):
+    username: str = Field(index=True, unique=True)
+    disabled: bool = False
+
+
+class UserAccount(UserAccountBase, table=True):
+    __tablename__ = 'user_account'
+
+    id: int = Field(default=None, primary_key=True)
+    hashed_password: str
+
+
+class TaskBulkCreated(SQLModel):
+    count: int
+    ids: List[int]
+
+
+class TaskPage(SQLModel):
+    items: List[Task]
+    next_cursor: Optional[int] = None
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from fastapi import APIRouter, Depends
+
+from app.core.auth import get_current_user, token_cache
+from app.core.users import user_cache
+from app.db import async_pool_metrics, pool_metrics
+
+router = APIRouter(prefix='/internal', tags=['internal'])
+
+
+@router.get('/auth/token-cache')
+async def view_token_cache(auth: Depends = Depends(get_current_user),) -> dict[str, Any]:
+    return token_cache.stats()
+
+
+@router.get('/db/pool')
+async def view_db_pool(auth: Depends = Depends(get_current_user),) -> dict[str, Any]:
+    return {'sync': pool_metrics.snapshot(), 'async': async_pool_metrics.snapshot()}
+
+
+def runtime_gauges() -> Iterable[tuple[str, str, str, dict[str, float]]]:
+    caches = {'token': token_cache.stats(), 'user': user_cache.stats()}
+    pools = {'sync': pool_metrics.snapshot(), 'async': async_pool_metrics.snapshot()}
+    for stat in ('size', 'hits', 'misses'):
+        yield f'app_cache_{stat}', f'In-process cache {stat}.', 'cache', {k: v[stat] for k, v in caches.items()}
+    for stat in ('checked_out', 'idle', 'overflow', 'wait_count', 'wait_seconds_total', 'wait_seconds_max'):
+        # Only the async pool tracks wait times.
+        values = {k: v[stat] for k, v in pools.items() if stat in v}
+        yield f'db_pool_{stat}', f'DB connection pool {stat}.', 'engine', values
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.db import async_engine, get_async_session
+from app.models import Task, TaskBulkCreated, TaskCreate, TaskPage
+
+router = APIRouter(prefix='/tasks', tags=['tasks'])
+
+NDJSON_MEDIA_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/json-seq')
+
+
+async def iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    buffer = b''
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield orjson.loads(line)
+    if buffer.strip():
+        yield orjson.loads(buffer)
+
+
+async def iter_json_array(request: Request) -> AsyncIterator[Any]:
+    payload = await request.json()
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail='Expected a JSON array of tasks')
+    for item in payload:
+        yield item
+
+
+async def insert_tasks(session: AsyncSession, rows: list[dict[str, Any]]) -> list[int]:
+    statement = insert(Task).values(rows)
+    if session.bind.dialect.full_returning:
+        result = await session.execute(statement.returning(Task.id))
+        return list(result.scalars())
+    # Without RETURNING (SQLite), rowids of a single multi-row INSERT are consecutive.
+    result = await session.execute(statement)
+    last_id = result.lastrowid
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+@router.post('/bulk', response_model=TaskBulkCreated, status_code=HTTPStatus.CREATED)
+async def create_tasks_bulk(
+    request: Request,
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict[str, Any]:
+    """Insert a JSON array or an NDJSON stream of tasks in a single transaction."""
+    chunk_size = chunk_size or settings.task_bulk_chunk_size
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    items = iter_ndjson(request) if content_type in NDJSON_MEDIA_TYPES else iter_json_array(request)
+
+    ids: list[int] = []
+    rows: list[dict[str, Any]] = []
+    parsed = 0
+    try:
+        async for item in items:
+            rows.append(TaskCreate.parse_obj(item).dict())
+            parsed += 1
+            if len(rows) >= chunk_size:
+                ids.extend(await insert_tasks(session, rows))
+                rows = []
+    except (ValueError, ValidationError) as e:
+        # orjson.JSONDecodeError is a ValueError; nothing is committed on failure.
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail={'item': parsed + 1, 'error': str(e)},
+        )
+    if rows:
+        ids.extend(await insert_tasks(session, rows))
+    await session.commit()
+    return {'count': len(ids), 'ids': ids}
+
+
+@router.get('', response_model=TaskPage)
+async def list_tasks(
+    after: int = Query(0, ge=0, description='Return tasks with an id greater than this cursor'),
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_async_session),
+) -> ORJSONResponse:
+    # Keyset pagination: the primary key index makes every page cost the same.
+    statement = select(Task.id, Task.task_name).where(Task.id > after).order_by(Task.id).limit(limit + 1)
+    rows = (await session.execute(statement)).mappings().all()
+    next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+    # Row mappings go straight to orjson, skipping a Task instance and `jsonable_encoder` per row.
+    return ORJSONResponse({'items': [dict(row) for row in rows[:limit]], 'next_cursor': next_cursor})
+
+
+async def stream_tasks_ndjson(after: int) -> AsyncIterator[bytes]:
+    statement = (
+        select(Task.id, Task.task_name)
+        .where(Task.id > after)
+        .order_by(Task.id)
+        .execution_options(yield_per=settings.task_stream_batch_size)
+    )
+    # A session of its own, so it stays open for as long as the response is streamed.
+    async with AsyncSession(async_engine) as session:
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            yield b''.join(
+                orjson.dumps({'id': task_id, 'task_name': task_name}) + b'\n' for task_id, task_name in rows
+            )
+
+
+@router.get('/stream')
+async def stream_tasks(after: int = Query(0, ge=0)) -> StreamingResponse:
+    """Export tasks as NDJSON through a server-side cursor, one batch in memory at a time."""
+    return StreamingResponse(stream_tasks_ndjson(after), media_type='application/x-ndjson')
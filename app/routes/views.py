@@ -1,19 +1,46 @@
 from __future__ import annotations
 
+from typing import List
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, conint, conlist
 
-from app.apis.api_a.mainmod import main_func as main_func_a
-from app.apis.api_b.mainmod import main_func as main_func_b
+from app.apis.api_a.mainmod import main_func as main_func_a, main_func_batch as main_func_batch_a
+from app.apis.api_b.mainmod import main_func as main_func_b, main_func_batch as main_func_batch_b
 from app.core.auth import get_current_user
 
 router = APIRouter()
 
 
+class BatchIn(BaseModel):
+    # Seeds are drawn from as int64 in one vectorized call.
+    nums: conlist(conint(ge=0, le=2**63 - 1), max_items=100_000)  # type: ignore
+
+
+class BatchItemOut(BaseModel):
+    seed: int
+    random_first: int
+    random_second: int
+
+
 @router.get('/api_a/{num}', tags=['api_a'])
 async def view_a(num: int, auth: Depends = Depends(get_current_user),) -> dict[str, int]:
     return main_func_a(num)
 
 
+# The batch views return an ORJSONResponse directly: the items are plain ints already, so
+# running thousands of them through `jsonable_encoder` would cost more than computing them.
+@router.post('/api_a/batch', tags=['api_a'], response_model=List[BatchItemOut])
+async def view_a_batch(payload: BatchIn, auth: Depends = Depends(get_current_user),) -> ORJSONResponse:
+    return ORJSONResponse(main_func_batch_a(payload.nums))
+
+
 @router.get('/api_b/{num}', tags=['api_b'])
 async def view_b(num: int, auth: Depends = Depends(get_current_user),) -> dict[str, int]:
     return main_func_b(num)
+
+
+@router.post('/api_b/batch', tags=['api_b'], response_model=List[BatchItemOut])
+async def view_b_batch(payload: BatchIn, auth: Depends = Depends(get_current_user),) -> ORJSONResponse:
+    return ORJSONResponse(main_func_batch_b(payload.nums))
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a scratch database before anything imports `app.config`.
+os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/test.db'
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app_startup():
+    # Runs the startup hooks once so tables and the default user exist.
+    with TestClient(app):
+        yield
@@ -65,3 +65,29 @@ def test_api_b(api_token):
 
     for val in response.json().values():
         assert isinstance(val, int)
+
+
+def test_create_task():
+    response = client.post('/task/', json={'task_name': 'write tests'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['task_name'] == 'write tests'
+    assert isinstance(response.json()['id'], int)
+
+
+def test_api_batch(api_token):
+    headers = {'Accept': 'application/json', 'Authorization': api_token}
+    for api in ('api_a', 'api_b'):
+        response = client.post(f'/{api}/batch', json={'nums': [1, 10, 100]}, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        items = response.json()
+        assert [item['seed'] for item in items] == [1, 10, 100]
+        assert all(0 <= item['random_first'] <= item['seed'] for item in items)
+
+        response = client.post(f'/{api}/batch', json={'nums': [-1]}, headers=headers)
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        response = client.post(f'/{api}/batch', json={'nums': [2**63 - 1]}, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+
+        response = client.post(f'/{api}/batch', json={'nums': [2**63]}, headers=headers)
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
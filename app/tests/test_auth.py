@@ -0,0 +1,102 @@
+import threading
+import time
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from app.core import auth, config, users
+from app.core.cache import LRUCache
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_token() -> str:
+    res = client.post(
+        '/token',
+        headers={'Accept': 'application/x-www-form-urlencoded'},
+        data={'username': config.API_USERNAME, 'password': config.API_PASSWORD},
+    )
+    return res.json()['access_token']
+
+
+def test_lru_cache_expiry_and_bound() -> None:
+    cache: LRUCache[int] = LRUCache(maxsize=2)
+    cache.set('a', 1, expires_at=time.time() + 60)
+    cache.set('b', 2, expires_at=time.time() - 1)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+    cache.set('c', 3, expires_at=time.time() + 60)
+    cache.set('d', 4, expires_at=time.time() + 60)
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_token_cache_hits_after_first_request() -> None:
+    auth.token_cache.clear()
+    headers = {'Authorization': f'Bearer {get_token()}'}
+
+    assert client.get('/api_a/10', headers=headers).status_code == HTTPStatus.OK
+    assert client.get('/api_a/10', headers=headers).status_code == HTTPStatus.OK
+
+    response = client.get('/internal/auth/token-cache', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['misses'] == 1
+    assert response.json()['hits'] == 2
+
+
+def test_login_rejected_when_password_pool_saturated(monkeypatch) -> None:
+    monkeypatch.setattr(auth, 'password_slots', threading.BoundedSemaphore(0))
+    res = client.post(
+        '/token',
+        headers={'Accept': 'application/x-www-form-urlencoded'},
+        data={'username': config.API_USERNAME, 'password': config.API_PASSWORD},
+    )
+    assert res.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert res.headers['Retry-After'] == '1'
+
+
+def test_default_user_uses_pre_hashed_password(monkeypatch) -> None:
+    hashed_password = auth.get_password_hash('secret')
+    monkeypatch.setattr(config, 'API_USERNAME', 'prehashed')
+    monkeypatch.setattr(config, 'API_PASSWORD_HASH', hashed_password)
+    auth.ensure_default_user()
+    assert users.get_user('prehashed').hashed_password == hashed_password
+
+
+def test_default_user_created_by_another_worker(monkeypatch) -> None:
+    monkeypatch.setattr(config, 'API_USERNAME', 'raced')
+    monkeypatch.setattr(config, 'API_PASSWORD_HASH', auth.get_password_hash('first'))
+    auth.ensure_default_user()
+
+    # This worker looked the user up before the other one created it.
+    monkeypatch.setattr(users, 'get_user', lambda username: None)
+    monkeypatch.setattr(config, 'API_PASSWORD_HASH', auth.get_password_hash('second'))
+    auth.ensure_default_user()
+    assert auth.verify_password('first', users.load_user('raced').hashed_password)
+
+
+def test_user_cache_invalidated_on_disable() -> None:
+    users.create_user('alice', auth.get_password_hash('wonderland'))
+    assert users.get_user('alice').disabled is False
+    assert users.get_cached_user('alice') is not None
+
+    users.disable_user('alice')
+    assert users.get_cached_user('alice') is None
+    assert users.get_user('alice').disabled is True
+
+    res = client.post('/token', data={'username': 'alice', 'password': 'wonderland'})
+    assert res.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_disabled_user_token_rejected() -> None:
+    users.create_user('bob', auth.get_password_hash('builder'))
+    token = client.post('/token', data={'username': 'bob', 'password': 'builder'}).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api_a/10', headers=headers).status_code == HTTPStatus.OK
+
+    users.disable_user('bob')
+    assert client.get('/api_a/10', headers=headers).status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, false
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import db
+from app.config import settings
+from app.main import app
+
+
+def test_create_db_and_tables_skips_unchanged_schema(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(db, 'engine', create_engine(f'sqlite:///{tmp_path}/test.db'))
+    monkeypatch.setattr(settings, 'db_skip_unchanged_schema', True)
+
+    assert db.stored_schema_fingerprint() is None
+    db.create_db_and_tables()
+    assert db.stored_schema_fingerprint() == db.schema_fingerprint()
+
+    def fail_create_all(*args, **kwargs):
+        raise AssertionError('create_all should be skipped')
+
+    monkeypatch.setattr(SQLModel.metadata, 'create_all', fail_create_all)
+    db.create_db_and_tables()
+
+
+def test_create_db_and_tables_tolerates_a_concurrent_worker(monkeypatch, tmp_path) -> None:
+    engine = create_engine(f'sqlite:///{tmp_path}/test.db')
+    monkeypatch.setattr(db, 'engine', engine)
+    monkeypatch.setattr(settings, 'db_skip_unchanged_schema', True)
+    db.create_db_and_tables()
+
+    # This worker read no fingerprint, and the other one's row was committed after its DELETE.
+    monkeypatch.setattr(db, 'stored_schema_fingerprint', lambda: None)
+    monkeypatch.setattr(db, 'delete', lambda table: delete(table).where(false()))
+    db.create_db_and_tables()
+
+    with Session(engine) as session:
+        assert session.exec(select(db.SchemaFingerprint.fingerprint)).all() == [db.schema_fingerprint()]
+
+
+def test_pool_metrics_track_checkouts(tmp_path) -> None:
+    engine = create_engine(f'sqlite:///{tmp_path}/pool.db', **db.engine_options('sqlite://'))
+    metrics = db.PoolMetrics(engine)
+
+    with engine.connect():
+        assert metrics.snapshot()['checked_out'] == 1
+    snapshot = metrics.snapshot()
+    assert snapshot['checked_out'] == 0
+    assert snapshot['checkouts'] == 1
+    assert snapshot['connections_created'] == 1
+
+
+def test_session_dependency_records_pool_wait() -> None:
+    before = db.async_pool_metrics.snapshot()['wait_count']
+    with TestClient(app) as client:
+        assert client.get('/tasks?limit=1').status_code == 200
+    assert db.async_pool_metrics.snapshot()['wait_count'] == before + 1
+    assert 'wait_count' not in db.pool_metrics.snapshot()
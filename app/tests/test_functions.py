@@ -1,5 +1,9 @@
+import numpy as np
+
 from app.apis.api_a.mainmod import main_func as main_func_a
+from app.apis.api_a.submod import rand_gen as rand_gen_a, rand_gen_batch as rand_gen_batch_a
 from app.apis.api_b.mainmod import main_func as main_func_b
+from app.apis.api_b.submod import rand_gen as rand_gen_b, rand_gen_batch as rand_gen_batch_b
 
 
 def mock_randint(*args, **kwargs):
@@ -29,3 +33,12 @@ def test_func_main_b(monkeypatch) -> None:
     assert result.get('seed') == seed
     assert result.get('random_first') == mock_randint()
     assert result.get('random_second') == mock_randint()
+
+
+def test_func_batch_matches_scalar_with_same_rng() -> None:
+    nums = [0, 1, 7, 420, 2 ** 40]
+    for rand_gen, rand_gen_batch in ((rand_gen_a, rand_gen_batch_a), (rand_gen_b, rand_gen_batch_b)):
+        scalar_rng, batch_rng = np.random.default_rng(42), np.random.default_rng(42)
+        expected = [rand_gen(num, scalar_rng) for num in nums]
+        assert rand_gen_batch(nums, batch_rng) == expected
+        assert rand_gen_batch([], batch_rng) == []
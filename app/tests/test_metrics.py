@@ -0,0 +1,35 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, ('/a',))
+    histogram.observe(0.5, ('/a',))
+    histogram.observe(5, ('/a',))
+    samples = list(histogram.samples())
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in samples
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in samples
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in samples
+    assert 'latency_seconds_count{route="/a"} 3' in samples
+
+
+def test_metrics_endpoint_labels_routes_by_template() -> None:
+    client.get('/api_a/5')
+    client.get('/ping')
+    client.get('/does-not-exist')
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api_a/{num}",status="401"}' in body
+    assert 'http_requests_total{method="GET",route="/ping",status="200"}' in body
+    assert 'route="<unmatched>",status="404"' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/ping",le="+Inf"}' in body
+    assert 'app_cache_hits{cache="token"}' in body
+    assert 'db_pool_checked_out{engine="async"}' in body
@@ -0,0 +1,63 @@
+import json
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_bulk_create_json_array():
+    payload = [{'task_name': f'task {i}'} for i in range(25)]
+    response = client.post('/tasks/bulk?chunk_size=10', json=payload)
+    assert response.status_code == HTTPStatus.CREATED
+    ids = response.json()['ids']
+    assert response.json()['count'] == 25
+    assert ids == list(range(ids[0], ids[0] + 25))
+
+
+def test_bulk_create_ndjson():
+    body = '\n'.join('{"task_name": "line %d"}' % i for i in range(5)) + '\n'
+    response = client.post('/tasks/bulk', data=body, headers={'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['count'] == 5
+
+
+def test_bulk_create_rejects_invalid_item_atomically():
+    before = client.post('/task/', json={'task_name': 'marker'}).json()['id']
+    body = '{"task_name": "ok"}\n{"name": "missing task_name"}\n'
+    response = client.post('/tasks/bulk?chunk_size=1', data=body, headers={'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail']['item'] == 2
+
+    after = client.post('/task/', json={'task_name': 'marker'}).json()['id']
+    assert after == before + 1
+
+
+def test_list_tasks_keyset_pagination():
+    ids = client.post('/tasks/bulk', json=[{'task_name': f'page {i}'} for i in range(5)]).json()['ids']
+    after = ids[0] - 1
+
+    first = client.get(f'/tasks?after={after}&limit=3').json()
+    assert [task['id'] for task in first['items']] == ids[:3]
+    assert first['next_cursor'] == ids[2]
+
+    second = client.get(f'/tasks?after={first["next_cursor"]}&limit=3').json()
+    assert [task['id'] for task in second['items']][:2] == ids[3:]
+
+
+def test_list_tasks_items_match_task_schema():
+    [task_id] = client.post('/tasks/bulk', json=[{'task_name': 'schema ü'}]).json()['ids']
+    response = client.get(f'/tasks?after={task_id - 1}&limit=1')
+    assert response.headers['content-type'] == 'application/json'
+    assert response.json()['items'] == [{'id': task_id, 'task_name': 'schema ü'}]
+
+
+def test_stream_tasks_ndjson():
+    ids = client.post('/tasks/bulk', json=[{'task_name': f'stream {i}'} for i in range(3)]).json()['ids']
+    response = client.get(f'/tasks/stream?after={ids[0] - 1}')
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['id'] for line in lines][:3] == ids
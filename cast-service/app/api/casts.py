@@ -1,23 +1,110 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
 
-from app.api.models import CastIn, CastOut
-from app.api import db_manager
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
+
+from app.api.models import CastBatchOut, CastChanges, CastIds, CastIn, CastOut
+from app.api import db_manager, response_cache
+from app.api.conditional import etag_matches, not_modified
 
 casts = APIRouter()
 
+MAX_BATCH_IDS = 1000
+MAX_CHANGES = 100000
+
+CAST_FIELDS = list(CastOut.__fields__)
+
+
+def cast_key(id: int) -> str:
+    return f'cast:{id}'
+
+
+def cast_dict(cast) -> dict:
+    # The CastOut fields of a database row, without building and re-encoding a model.
+    return {field: cast[field] for field in CAST_FIELDS}
+
+
+def cast_etag(id: int, version: int) -> str:
+    return f'"{id}-{version}"'
+
 
 @casts.post('/', response_model=CastOut, status_code=201)
 async def create_cast(payload: CastIn):
     cast_id = await db_manager.add_cast(payload)
+    # Nothing is cached for an id before it exists, unless a shared backend outlived the database.
+    await response_cache.invalidate(cast_key(cast_id))
 
     response = {'id': cast_id, **payload.dict()}
 
     return response
 
 
+@casts.get('/changes', response_model=CastChanges)
+async def get_cast_changes(
+    since: int = Query(0, ge=0, description='Cursor returned by the previous call; 0 for the full set'),
+    limit: int = Query(10000, ge=1, le=MAX_CHANGES),
+):
+    """Ids inserted and deleted after `since`, for replicas of the set of cast ids."""
+    changes = await db_manager.get_cast_changes(since, limit)
+    # Only the last change of an id in the page matters.
+    ops = {change['cast_id']: change['op'] for change in changes}
+    return ORJSONResponse(
+        {
+            'inserted': [id for id, op in ops.items() if op == 'I'],
+            'deleted': [id for id, op in ops.items() if op == 'D'],
+            'cursor': changes[-1]['seq'] if changes else since,
+            'more': len(changes) == limit,
+        }
+    )
+
+
+@casts.get('/ids', response_model=CastIds)
+async def get_cast_ids(
+    after: int = Query(0, ge=0, description='Return ids greater than this one'),
+    limit: int = Query(10000, ge=1, le=MAX_CHANGES),
+):
+    """A page of the current cast ids, with the change feed cursor to follow them from.
+
+    Replicas load every page, then poll /changes from the cursor of the first page.
+    """
+    # Read before the ids: changes made meanwhile are then replayed from the feed.
+    cursor = await db_manager.get_change_cursor()
+    ids = await db_manager.get_cast_ids(after, limit)
+    return ORJSONResponse({'ids': ids, 'cursor': cursor, 'more': len(ids) == limit})
+
+
 @casts.get('/{id}/', response_model=CastOut)
-async def get_cast(id: int):
-    cast = await db_manager.get_cast(id)
-    if not cast:
+async def get_cast(id: int, if_none_match: Optional[str] = Header(None)):
+    async def current_etag():
+        # Writes made through other workers bump the version too.
+        version = await db_manager.get_cast_version(id)
+        return cast_etag(id, version) if version is not None else None
+
+    async def load():
+        cast = await db_manager.get_cast(id)
+        return response_cache.pack(cast_etag(id, cast['version']), orjson.dumps(cast_dict(cast))) if cast else None
+
+    entry = await response_cache.get_or_load_current(cast_key(id), current_etag, load)
+    if entry is None:
         raise HTTPException(status_code=404, detail='Cast not found')
-    return cast
+    etag, body = response_cache.unpack(entry)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type='application/json', headers={'ETag': etag})
+
+
+@casts.get('/', response_model=CastBatchOut)
+async def get_casts(ids: str = Query(..., description='Comma separated cast ids, e.g. 1,2,3')):
+    try:
+        cast_ids = list(dict.fromkeys(int(id) for id in ids.split(',') if id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail='ids must be comma separated integers')
+    if len(cast_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f'At most {MAX_BATCH_IDS} ids per request')
+
+    found = await db_manager.get_casts(cast_ids)
+    found_ids = {cast['id'] for cast in found}
+    return ORJSONResponse(
+        {'casts': [cast_dict(cast) for cast in found], 'missing': [id for id in cast_ids if id not in found_ids]}
+    )
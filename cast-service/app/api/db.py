@@ -1,6 +1,6 @@
 import os
 
-from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine
+from sqlalchemy import BigInteger, Column, Integer, MetaData, String, Table, create_engine
 
 from databases import Database
 
@@ -15,6 +15,67 @@ casts = Table(
     Column('id', Integer, primary_key=True),
     Column('name', String(50)),
     Column('nationality', String(20)),
+    # Bumped by the casts_row_version trigger on every UPDATE; part of the ETag.
+    Column('version', Integer, nullable=False, server_default='1'),
 )
 
+# Append-only log of inserted ('I') and deleted ('D') cast ids, written by a trigger on casts.
+cast_changes = Table(
+    'cast_changes',
+    metadata,
+    Column('seq', BigInteger, primary_key=True),
+    Column('cast_id', Integer, nullable=False),
+    Column('op', String(1), nullable=False),
+)
+
+VERSION_TRACKING_DDL = [
+    # Concurrently starting workers would otherwise race on the function and trigger DDL.
+    "SELECT pg_advisory_xact_lock(hashtext('casts_version_tracking'))",
+    'ALTER TABLE casts ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1',
+    """
+    CREATE OR REPLACE FUNCTION bump_row_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS casts_row_version ON casts',
+    'CREATE TRIGGER casts_row_version BEFORE UPDATE ON casts FOR EACH ROW EXECUTE PROCEDURE bump_row_version()',
+]
+
+CHANGE_FEED_DDL = [
+    "SELECT pg_advisory_xact_lock(hashtext('casts_change_feed'))",
+    """
+    CREATE OR REPLACE FUNCTION log_cast_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO cast_changes (cast_id, op) VALUES (NEW.id, 'I');
+        ELSE
+            INSERT INTO cast_changes (cast_id, op) VALUES (OLD.id, 'D');
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS casts_change_feed ON casts',
+    'CREATE TRIGGER casts_change_feed AFTER INSERT OR DELETE ON casts FOR EACH ROW EXECUTE PROCEDURE log_cast_change()',
+    # Casts that existed before the feed start it as inserts.
+    """
+    INSERT INTO cast_changes (cast_id, op)
+    SELECT id, 'I' FROM casts WHERE NOT EXISTS (SELECT 1 FROM cast_changes) ORDER BY id
+    """,
+]
+
+
+def create_version_tracking():
+    with engine.begin() as conn:
+        for statement in VERSION_TRACKING_DDL:
+            conn.execute(statement)
+
+
+def create_change_feed():
+    with engine.begin() as conn:
+        for statement in CHANGE_FEED_DDL:
+            conn.execute(statement)
+
+
 database = Database(DATABASE_URI)
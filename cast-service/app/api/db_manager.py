@@ -1,5 +1,13 @@
+from typing import List, Optional
+
+from sqlalchemy import ARRAY, Integer, any_, bindparam, func, select
+
 from app.api.models import CastIn
-from app.api.db import casts, database
+from app.api.db import cast_changes, casts, database
+from app.api.singleflight import SingleFlight
+
+get_cast_flight = SingleFlight()
+get_cast_version_flight = SingleFlight()
 
 
 async def add_cast(payload: CastIn):
@@ -10,4 +18,32 @@ async def add_cast(payload: CastIn):
 
 async def get_cast(id):
     query = casts.select(casts.c.id == id)
-    return await database.fetch_one(query=query)
+    return await get_cast_flight.do(id, lambda: database.fetch_one(query=query))
+
+
+async def get_cast_version(id: int) -> Optional[int]:
+    # Read on every GET /{id}/ to check the cached body, so hot ids share it like get_cast.
+    query = select([casts.c.version]).where(casts.c.id == id)
+    row = await get_cast_version_flight.do(id, lambda: database.fetch_one(query=query))
+    return row['version'] if row else None
+
+
+async def get_casts(ids: List[int]):
+    # A single `id = ANY(:ids)` statement, whatever the number of ids.
+    query = casts.select(casts.c.id == any_(bindparam('ids', ids, type_=ARRAY(Integer))))
+    return await database.fetch_all(query=query)
+
+
+async def get_cast_changes(since: int, limit: int):
+    query = cast_changes.select().where(cast_changes.c.seq > since).order_by(cast_changes.c.seq).limit(limit)
+    return await database.fetch_all(query=query)
+
+
+async def get_cast_ids(after: int, limit: int) -> List[int]:
+    query = select([casts.c.id]).where(casts.c.id > after).order_by(casts.c.id).limit(limit)
+    return [row['id'] for row in await database.fetch_all(query=query)]
+
+
+async def get_change_cursor() -> int:
+    query = select([func.coalesce(func.max(cast_changes.c.seq), 0).label('seq')])
+    return (await database.fetch_one(query=query))['seq']
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class CastIn(BaseModel):
@@ -13,3 +13,21 @@ class CastOut(CastIn):
 
 class CastUpdate(CastIn):
     name: Optional[str] = None
+
+
+class CastBatchOut(BaseModel):
+    casts: List[CastOut]
+    missing: List[int]
+
+
+class CastChanges(BaseModel):
+    inserted: List[int]
+    deleted: List[int]
+    cursor: int
+    more: bool
+
+
+class CastIds(BaseModel):
+    ids: List[int]
+    cursor: int
+    more: bool
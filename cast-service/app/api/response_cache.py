@@ -0,0 +1,140 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '10000'))
+# How long an unused entry is kept. It does not bound staleness: see get_or_load_current.
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '300'))
+
+
+class CacheBackend(ABC):
+    """Storage for serialized response bodies.
+
+    Methods are coroutines so that a shared backend (e.g. Redis) can implement them
+    with network calls.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    def stats(self) -> Dict[str, float]:
+        return {}
+
+
+class LRUBackend(CacheBackend):
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: bytes):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+backend: CacheBackend = LRUBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+# [generation, loads running] of the keys being loaded, so that an invalidation during
+# a load stops its possibly stale body from being stored. Only kept while loads run.
+_loading: Dict[str, List[int]] = {}
+
+
+def pack(etag: str, body: bytes) -> bytes:
+    # The ETag is kept on the first line so conditional requests never touch the body.
+    return etag.encode() + b'\n' + body
+
+
+def unpack(entry: bytes) -> Tuple[str, bytes]:
+    etag, _, body = entry.partition(b'\n')
+    return etag.decode(), body
+
+
+async def get_or_load(key: str, load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+    """Return the cached body for `key`, calling `load` on a miss. `None` results are not cached."""
+    body = await backend.get(key)
+    if body is None:
+        body = await _load(key, load)
+    return body
+
+
+async def get_or_load_current(
+    key: str, current_etag: Callable[[], Awaitable[Optional[str]]], load: Callable[[], Awaitable[Optional[bytes]]]
+) -> Optional[bytes]:
+    """get_or_load for packed entries, serving a cached one only while its ETag is `current_etag()`.
+
+    invalidate only reaches this process, so a cached entry may predate a write or delete
+    made through another worker. `current_etag` reads the ETag cheaply, e.g. from a row
+    version, and returns None once the row is gone. A freshly loaded entry is not checked.
+    """
+    entry = await backend.get(key)
+    if entry is not None:
+        etag = await current_etag()
+        if etag is not None and unpack(entry)[0] == etag:
+            return entry
+        await invalidate(key)
+        if etag is None:
+            return None
+    return await _load(key, load)
+
+
+async def _load(key: str, load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+    state = _loading.setdefault(key, [0, 0])
+    generation = state[0]
+    state[1] += 1
+    try:
+        body = await load()
+    finally:
+        state[1] -= 1
+        if not state[1]:
+            del _loading[key]
+    if body is not None and state[0] == generation:
+        await backend.set(key, body)
+    return body
+
+
+async def invalidate(key: str):
+    """Drop `key` from the backend. With the in-process LRUBackend, other workers keep their copy."""
+    if key in _loading:
+        _loading[key][0] += 1
+    await backend.delete(key)
@@ -0,0 +1,25 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its result.
+
+    Nothing is kept once the call completes, so a later caller always gets a fresh result.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self.calls.get(key)
+        if future is None:
+            future = self.calls[key] = asyncio.ensure_future(fn())
+            future.add_done_callback(lambda _: self.calls.pop(key, None))
+            self.started += 1
+        else:
+            self.shared += 1
+        # Shielded, so that a cancelled caller does not cancel the call for the others.
+        return await asyncio.shield(future)
@@ -1,10 +1,17 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.api.casts import casts
-from app.api.db import metadata, database, engine
+from app.api.db import metadata, database, engine, create_change_feed, create_version_tracking
 
 metadata.create_all(engine)
-
-app = FastAPI(openapi_url='/api/v1/casts/openapi.json', docs_url='/api/v1/casts/docs')
+create_version_tracking()
+create_change_feed()
+
+app = FastAPI(
+    openapi_url='/api/v1/casts/openapi.json',
+    docs_url='/api/v1/casts/docs',
+    default_response_class=ORJSONResponse,
+)
 
 
 @app.on_event('startup')
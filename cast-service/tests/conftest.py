@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# Run from the cast-service folder (`python -m pytest tests`); no database is needed.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# app.api.db builds its engine at import, but nothing here connects to it.
+os.environ.setdefault('DATABASE_URI', 'postgresql://localhost/cast_db')
+
+
+@pytest.fixture
+def client():
+    """A TestClient for the casts routes alone; app.main would create the tables at import."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.casts import casts
+
+    app = FastAPI()
+    app.include_router(casts, prefix='/api/v1/casts')
+    return TestClient(app)
@@ -0,0 +1,58 @@
+from app.api import db_manager, response_cache
+from app.api.conditional import etag_matches, not_modified
+
+
+def test_etag_matches():
+    etag = '"7-3"'
+    assert etag_matches('"7-3"', etag)
+    assert etag_matches('W/"7-3"', etag)
+    assert etag_matches('"1-1", W/"7-3"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"7-2"', etag)
+    assert not etag_matches('7-3', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('', etag)
+
+
+def test_not_modified():
+    response = not_modified('"7-3"')
+    assert response.status_code == 304
+    assert response.headers['ETag'] == '"7-3"'
+    assert response.body == b''
+
+
+def test_get_cast_answers_a_matching_etag_with_304(client, monkeypatch):
+    monkeypatch.setattr(response_cache, 'backend', response_cache.LRUBackend(100, 60))
+    cast = {'id': 7, 'name': 'Ann', 'nationality': 'FR', 'version': 3}
+    reads = []
+
+    async def get_cast(id):
+        reads.append(id)
+        return cast if id == 7 else None
+
+    async def get_cast_version(id):
+        return cast['version'] if id == 7 else None
+
+    monkeypatch.setattr(db_manager, 'get_cast', get_cast)
+    monkeypatch.setattr(db_manager, 'get_cast_version', get_cast_version)
+
+    response = client.get('/api/v1/casts/7/')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"7-3"'
+    assert response.json() == {'id': 7, 'name': 'Ann', 'nationality': 'FR'}
+
+    for if_none_match in ['"7-3"', 'W/"7-3"', '"1-1", "7-3"']:
+        response = client.get('/api/v1/casts/7/', headers={'If-None-Match': if_none_match})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == '"7-3"'
+        assert response.content == b''
+    assert reads == [7]
+
+    # A write made through another worker bumps the version.
+    cast = {**cast, 'name': 'Anne', 'version': 4}
+    response = client.get('/api/v1/casts/7/', headers={'If-None-Match': '"7-3"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"7-4"'
+    assert response.json()['name'] == 'Anne'
+
+    assert client.get('/api/v1/casts/8/', headers={'If-None-Match': '*'}).status_code == 404
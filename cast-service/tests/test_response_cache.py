@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.api import response_cache
+
+
+@pytest.fixture(autouse=True)
+def backend(monkeypatch):
+    backend = response_cache.LRUBackend(100, 60)
+    monkeypatch.setattr(response_cache, 'backend', backend)
+    return backend
+
+
+def test_loaded_body_is_cached(backend):
+    async def main():
+        async def load():
+            return b'body'
+
+        assert await response_cache.get_or_load('k', load) == b'body'
+        assert await backend.get('k') == b'body'
+        assert response_cache._loading == {}
+
+    asyncio.run(main())
+
+
+def test_invalidation_during_a_load_keeps_its_body_out_of_the_cache(backend):
+    async def main():
+        loading = asyncio.Event()
+        release = asyncio.Event()
+
+        async def stale_load():
+            loading.set()
+            await release.wait()
+            return b'stale'
+
+        reader = asyncio.ensure_future(response_cache.get_or_load('k', stale_load))
+        await loading.wait()
+        await response_cache.invalidate('k')
+        release.set()
+        # The reader still gets its body, but the next one loads again.
+        assert await reader == b'stale'
+        assert await backend.get('k') is None
+        assert response_cache._loading == {}
+
+    asyncio.run(main())
+
+
+def test_cached_entry_is_served_only_while_its_etag_is_current(backend):
+    async def main():
+        # Cached before a write made through another worker.
+        await backend.set('k', response_cache.pack('"1-1"', b'old'))
+        current = ['"1-2"']
+        loads = []
+
+        async def current_etag():
+            return current[0]
+
+        async def load():
+            loads.append(1)
+            return response_cache.pack('"1-2"', b'new')
+
+        entry = await response_cache.get_or_load_current('k', current_etag, load)
+        assert response_cache.unpack(entry) == ('"1-2"', b'new')
+        assert await backend.get('k') == entry
+        assert await response_cache.get_or_load_current('k', current_etag, load) == entry
+        assert len(loads) == 1
+
+        # Deleted through another worker.
+        current[0] = None
+        assert await response_cache.get_or_load_current('k', current_etag, load) is None
+        assert await backend.get('k') is None
+        assert len(loads) == 1
+
+    asyncio.run(main())
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        response_cache.CacheBackend()
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.api.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'row'
+
+        assert await asyncio.gather(*(flight.do(1, fetch) for _ in range(5))) == ['row'] * 5
+        assert len(calls) == 1
+        assert (flight.started, flight.shared) == (1, 4)
+        assert flight.calls == {}
+
+        # Nothing is kept once the call completes.
+        assert await flight.do(1, fetch) == 'row'
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_different_keys_do_not_share():
+    async def main():
+        flight = SingleFlight()
+
+        async def fetch(key):
+            await asyncio.sleep(0)
+            return key
+
+        assert await asyncio.gather(flight.do(1, lambda: fetch(1)), flight.do(2, lambda: fetch(2))) == [1, 2]
+        assert flight.started == 2
+
+    asyncio.run(main())
+
+
+def test_errors_reach_every_caller():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ConnectionError('database gone')
+
+        results = await asyncio.gather(*(flight.do(1, fail) for _ in range(3)), return_exceptions=True)
+        assert [type(result) for result in results] == [ConnectionError] * 3
+        assert flight.calls == {}
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_the_call_for_others():
+    async def main():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return 'row'
+
+        first = asyncio.ensure_future(flight.do(1, fetch))
+        second = asyncio.ensure_future(flight.do(1, fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 'row'
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
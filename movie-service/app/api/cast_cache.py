@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CastCache:
+    """Bounded LRU of cast-id existence with separate TTLs for found and missing ids.
+
+    Missing ids expire sooner, so a cast created in cast-service becomes usable
+    quickly while repeated lookups of unknown ids still avoid the network.
+    """
+
+    def __init__(self, maxsize: int, positive_ttl: float, negative_ttl: float):
+        self.maxsize = maxsize
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[int, tuple]' = OrderedDict()
+
+    def get(self, cast_id: int) -> Optional[bool]:
+        entry = self._entries.get(cast_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[cast_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(cast_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, cast_id: int, present: bool):
+        ttl = self.positive_ttl if present else self.negative_ttl
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        self._entries[cast_id] = (time.monotonic() + ttl, present)
+        self._entries.move_to_end(cast_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
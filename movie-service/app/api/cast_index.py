@@ -0,0 +1,49 @@
+from typing import Dict, Iterable
+
+
+class CastIndex:
+    """Set of known cast ids stored as a bitmap, one bit per id up to the largest id seen.
+
+    Its size follows the largest id, not the number of casts: ids up to ten million
+    take 1.25 MB however few of them exist. Ids above `max_id` are not stored, so
+    lookups for them fall back to cast-service. Membership is a byte lookup and a shift.
+    """
+
+    def __init__(self, max_id: int):
+        self.max_id = max_id
+        self.bits = bytearray()
+        self.count = 0
+        self.ignored = 0
+
+    def __contains__(self, cast_id: int) -> bool:
+        byte = cast_id >> 3
+        return 0 <= byte < len(self.bits) and bool(self.bits[byte] >> (cast_id & 7) & 1)
+
+    def add(self, cast_id: int):
+        if cast_id < 0:
+            return
+        if cast_id > self.max_id:
+            self.ignored += 1
+            return
+        byte = cast_id >> 3
+        if byte >= len(self.bits):
+            # Grow geometrically so that appending new ids stays amortized O(1).
+            self.bits.extend(bytes(min(max(byte + 1, 2 * len(self.bits)), (self.max_id >> 3) + 1) - len(self.bits)))
+        if not self.bits[byte] >> (cast_id & 7) & 1:
+            self.bits[byte] |= 1 << (cast_id & 7)
+            self.count += 1
+
+    def discard(self, cast_id: int):
+        byte = cast_id >> 3
+        if 0 <= byte < len(self.bits) and self.bits[byte] >> (cast_id & 7) & 1:
+            self.bits[byte] &= ~(1 << (cast_id & 7)) & 0xFF
+            self.count -= 1
+
+    def apply(self, inserted: Iterable[int], deleted: Iterable[int]):
+        for cast_id in inserted:
+            self.add(cast_id)
+        for cast_id in deleted:
+            self.discard(cast_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {'ids': self.count, 'bytes': len(self.bits), 'max_id': self.max_id, 'ignored_ids': self.ignored}
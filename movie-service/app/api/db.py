@@ -1,6 +1,7 @@
 import os
 
-from sqlalchemy import ARRAY, Column, Integer, MetaData, String, Table, create_engine
+from sqlalchemy import BigInteger, Column, Index, Integer, MetaData, String, Table, create_engine, inspect
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from databases import Database
 
@@ -17,6 +18,60 @@ movies = Table(
     Column('plot', String(250)),
     Column('genres', ARRAY(String)),
     Column('casts_id', ARRAY(Integer)),
+    # Bumped by the movies_row_version trigger on every UPDATE; part of the ETag.
+    Column('version', Integer, nullable=False, server_default='1'),
+    # GIN indexes serve the `@>` containment filters of the movie listing.
+    Index('ix_movies_genres', 'genres', postgresql_using='gin'),
+    Index('ix_movies_casts_id', 'casts_id', postgresql_using='gin'),
 )
 
+# One row per table, bumped by a statement trigger on any write to it: the ETag of listings.
+collection_versions = Table(
+    'collection_versions',
+    metadata,
+    Column('name', String(50), primary_key=True),
+    Column('version', BigInteger, nullable=False, server_default='0'),
+)
+
+VERSION_TRACKING_DDL = [
+    # Concurrently starting workers would otherwise race on the function and trigger DDL.
+    "SELECT pg_advisory_xact_lock(hashtext('movies_version_tracking'))",
+    'ALTER TABLE movies ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1',
+    """
+    CREATE OR REPLACE FUNCTION bump_row_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO collection_versions (name, version) VALUES (TG_TABLE_NAME, 1)
+        ON CONFLICT (name) DO UPDATE SET version = collection_versions.version + 1;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS movies_row_version ON movies',
+    'CREATE TRIGGER movies_row_version BEFORE UPDATE ON movies FOR EACH ROW EXECUTE PROCEDURE bump_row_version()',
+    'DROP TRIGGER IF EXISTS movies_collection_version ON movies',
+    'CREATE TRIGGER movies_collection_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON movies '
+    'FOR EACH STATEMENT EXECUTE PROCEDURE bump_collection_version()',
+]
+
+
+def create_version_tracking():
+    with engine.begin() as conn:
+        for statement in VERSION_TRACKING_DDL:
+            conn.execute(statement)
+
+
+def create_missing_indexes(table: Table = movies):
+    # metadata.create_all() only creates indexes together with a new table.
+    existing = {index['name'] for index in inspect(engine).get_indexes(table.name, schema=table.schema)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(engine)
+
+
 database = Database(DATABASE_URI)
@@ -1,16 +1,51 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
 from app.api.models import MovieIn
-from app.api.db import movies, database
+from app.api.db import collection_versions, movies, database
 
 
 async def add_movie(payload: MovieIn):
-    query = movies.insert().values(**payload.dict())
+    query = movies.insert().values(**payload.dict()).returning(movies)
+
+    return await database.fetch_one(query=query)
+
+
+async def add_movies(payloads: List[MovieIn]) -> List[int]:
+    # One multi-row INSERT; ids come back in the order of the given rows.
+    query = movies.insert().values([payload.dict() for payload in payloads]).returning(movies.c.id)
+    return [row['id'] for row in await database.fetch_all(query=query)]
+
+
+def list_movies_query(
+    after: int = 0, limit: Optional[int] = None, genres: Optional[List[str]] = None, casts_id: Optional[List[int]] = None,
+):
+    # Keyset pagination on the primary key; array filters match every given value.
+    query = movies.select().where(movies.c.id > after)
+    if genres:
+        query = query.where(movies.c.genres.contains(genres))
+    if casts_id:
+        # A cast is in few movies, but the planner's default estimate for `@>` makes it walk
+        # the primary key to fill the LIMIT. Sorting on `id + 0` forces the GIN index instead.
+        query = query.where(movies.c.casts_id.contains(casts_id)).order_by(movies.c.id + 0)
+    else:
+        query = query.order_by(movies.c.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
 
-    return await database.execute(query=query)
 
+async def get_all_movies(
+    after: int = 0, limit: Optional[int] = None, genres: Optional[List[str]] = None, casts_id: Optional[List[int]] = None,
+):
+    return await database.fetch_all(query=list_movies_query(after, limit, genres, casts_id))
 
-async def get_all_movies():
-    query = movies.select()
-    return await database.fetch_all(query=query)
+
+async def iterate_movies(genres: Optional[List[str]] = None, casts_id: Optional[List[int]] = None):
+    # Server-side cursor: rows are fetched in small batches as the caller consumes them.
+    async for movie in database.iterate(query=list_movies_query(genres=genres, casts_id=casts_id)):
+        yield movie
 
 
 async def get_movie(id):
@@ -18,11 +53,26 @@ async def get_movie(id):
     return await database.fetch_one(query=query)
 
 
+async def get_movie_version(id: int) -> Optional[int]:
+    # A primary-key lookup of one column, cheap enough to check cached bodies on every read.
+    row = await database.fetch_one(query=select([movies.c.version]).where(movies.c.id == id))
+    return row['version'] if row else None
+
+
 async def delete_movie(id: int):
-    query = movies.delete().where(movies.c.id == id)
-    return await database.execute(query=query)
+    query = movies.delete().where(movies.c.id == id).returning(movies)
+    return await database.fetch_one(query=query)
+
+
+async def update_movie(id: int, values: Dict[str, Any]):
+    # Only the given columns are written; the row comes back in the same round trip.
+    if not values:
+        return await get_movie(id)
+    query = movies.update().where(movies.c.id == id).values(**values).returning(movies)
+    return await database.fetch_one(query=query)
 
 
-async def update_movie(id: int, payload: MovieIn):
-    query = movies.update().where(movies.c.id == id).values(**payload.dict())
-    return await database.execute(query=query)
+async def get_collection_version(name: str = 'movies') -> int:
+    query = collection_versions.select().where(collection_versions.c.name == name)
+    row = await database.fetch_one(query=query)
+    return row['version'] if row else 0
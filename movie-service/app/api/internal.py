@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api import response_cache, service
+from app.api.resilience import CLOSED, HALF_OPEN, OPEN
+
+internal = APIRouter()
+
+
+@internal.get('/stats')
+async def get_stats():
+    return {
+        'cast_cache': service.cast_cache.stats(),
+        'cast_index': service.cast_replica.stats(),
+        'response_cache': response_cache.backend.stats(),
+        'cast_service': service.cast_caller.stats(),
+    }
+
+
+@internal.get('/metrics', response_class=PlainTextResponse)
+async def get_metrics():
+    """Cast-service client metrics in the Prometheus text format."""
+    caller = service.cast_caller
+    lines = [
+        '# HELP cast_service_breaker_state Circuit breaker state of cast-service calls (1 for the current state).',
+        '# TYPE cast_service_breaker_state gauge',
+    ]
+    lines.extend(
+        f'cast_service_breaker_state{{state="{state}"}} {int(caller.breaker.state == state)}'
+        for state in (CLOSED, OPEN, HALF_OPEN)
+    )
+    lines.extend([
+        '# HELP cast_service_breaker_opens_total Times the circuit breaker opened.',
+        '# TYPE cast_service_breaker_opens_total counter',
+        f'cast_service_breaker_opens_total {caller.breaker.opens}',
+        '# HELP cast_service_calls_total Cast-service calls by outcome.',
+        '# TYPE cast_service_calls_total counter',
+    ])
+    lines.extend(f'cast_service_calls_total{{outcome="{outcome}"}} {count}' for outcome, count in caller.outcomes.items())
+    lines.extend([
+        '# HELP cast_service_hedges_total Hedged second calls started.',
+        '# TYPE cast_service_hedges_total counter',
+        f'cast_service_hedges_total {caller.hedges}',
+        '# HELP cast_service_hedge_wins_total Hedged calls that answered before the original.',
+        '# TYPE cast_service_hedge_wins_total counter',
+        f'cast_service_hedge_wins_total {caller.hedge_wins}',
+    ])
+    return '\n'.join(lines) + '\n'
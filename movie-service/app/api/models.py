@@ -1,10 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, constr
 from typing import List, Optional
 
 
+# Lengths of the movies table columns.
+MovieName = constr(max_length=50)
+MoviePlot = constr(max_length=250)
+
+
 class MovieIn(BaseModel):
-    name: str
-    plot: str
+    name: MovieName
+    plot: MoviePlot
     genres: List[str]
     casts_id: List[int]
 
@@ -14,7 +19,7 @@ class MovieOut(MovieIn):
 
 
 class MovieUpdate(MovieIn):
-    name: Optional[str] = None
-    plot: Optional[str] = None
+    name: Optional[MovieName] = None
+    plot: Optional[MoviePlot] = None
     genres: Optional[List[str]] = None
     casts_id: Optional[List[int]] = None
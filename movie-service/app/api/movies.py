@@ -1,65 +1,240 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+import os
+from typing import AsyncIterator, List, Optional, Tuple
+
+import asyncpg
+import httpx
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
 
 from app.api.models import MovieOut, MovieIn, MovieUpdate
-from app.api import db_manager
-from app.api.service import is_cast_present
+from app.api import db_manager, response_cache
+from app.api.conditional import etag_matches, not_modified
+from app.api.service import missing_casts
 
 movies = APIRouter()
 
+# Lines validated and inserted together by POST /bulk; bounds its memory use.
+MOVIE_BULK_CHUNK_SIZE = int(os.environ.get('MOVIE_BULK_CHUNK_SIZE', '1000'))
+# Longest line POST /bulk buffers; longer lines are reported as errors and skipped.
+MOVIE_BULK_MAX_LINE_BYTES = int(os.environ.get('MOVIE_BULK_MAX_LINE_BYTES', str(64 * 1024)))
+# Rows serialized into each chunk written by GET /export.
+MOVIE_EXPORT_BATCH_ROWS = int(os.environ.get('MOVIE_EXPORT_BATCH_ROWS', '500'))
 
-@movies.post('/', response_model=MovieOut, status_code=201)
-async def create_movie(payload: MovieIn):
-    for cast_id in payload.casts_id:
-        if not is_cast_present(cast_id):
-            raise HTTPException(
-                status_code=404, detail=f'Cast with given id:{cast_id} not found'
-            )
+MOVIE_FIELDS = list(MovieOut.__fields__)
+
+
+def movie_key(id: int) -> str:
+    return f'movie:{id}'
+
+
+def movie_dict(movie) -> dict:
+    # The MovieOut fields of a database row, without building and re-encoding a model.
+    return {field: movie[field] for field in MOVIE_FIELDS}
+
+
+def movie_etag(id: int, version: int) -> str:
+    return f'"{id}-{version}"'
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator is still reading the request body.
+
+    StreamingResponse listens for a disconnect on `receive` while streaming, which
+    would swallow the request body chunks, so that listener is left out.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
 
-    movie_id = await db_manager.add_movie(payload)
-    response = {'id': movie_id, **payload.dict()}
 
-    return response
+@movies.post('/', response_model=MovieOut, status_code=201)
+async def create_movie(payload: MovieIn):
+    missing = await missing_casts(payload.casts_id)
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f'Cast with given id:{missing[0]} not found'
+        )
+
+    return await db_manager.add_movie(payload)
+
+
+async def iter_lines(request: Request) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Yield the numbered non-blank lines of the body, with None for a line that is too long."""
+    line_no = 0
+    buffer = b''
+    # Set while the rest of a line that was too long is being discarded.
+    skipping = False
+    async for chunk in request.stream():
+        *lines, rest = (buffer + chunk).split(b'\n')
+        for line in lines:
+            line_no += 1
+            if skipping:
+                skipping = False
+            elif len(line) > MOVIE_BULK_MAX_LINE_BYTES:
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line
+        if skipping:
+            buffer = b''
+        elif len(rest) > MOVIE_BULK_MAX_LINE_BYTES:
+            yield line_no + 1, None
+            buffer, skipping = b'', True
+        else:
+            buffer = rest
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+async def import_chunk(chunk: List[Tuple[int, Optional[bytes]]]) -> List[dict]:
+    results = {}
+    parsed = []
+    for line_no, line in chunk:
+        if line is None:
+            results[line_no] = {'line': line_no, 'error': f'Line is longer than {MOVIE_BULK_MAX_LINE_BYTES} bytes'}
+            continue
+        try:
+            parsed.append((line_no, MovieIn.parse_raw(line)))
+        except ValidationError as e:
+            results[line_no] = {'line': line_no, 'error': str(e)}
+
+    # One deduplicated lookup for every cast id of the chunk.
+    try:
+        missing = set(await missing_casts(cast_id for _, payload in parsed for cast_id in payload.casts_id))
+    except httpx.HTTPError:
+        missing = None
+    valid = []
+    for line_no, payload in parsed:
+        if missing is None:
+            results[line_no] = {'line': line_no, 'error': 'Cast service unavailable'}
+            continue
+        absent = next((cast_id for cast_id in payload.casts_id if cast_id in missing), None)
+        if absent is not None:
+            results[line_no] = {'line': line_no, 'error': f'Cast with given id:{absent} not found'}
+        else:
+            valid.append((line_no, payload))
+
+    if valid:
+        for (line_no, _), result in zip(valid, await insert_movies([payload for _, payload in valid])):
+            results[line_no] = {'line': line_no, **result}
+    return [results[line_no] for line_no, _ in chunk]
+
+
+async def insert_movies(payloads: List[MovieIn]) -> List[dict]:
+    try:
+        return [{'id': movie_id} for movie_id in await db_manager.add_movies(payloads)]
+    except asyncpg.PostgresError as e:
+        if len(payloads) == 1:
+            return [{'error': str(e)}]
+    # A row the database rejects fails the whole multi-row INSERT, so the rows are retried one by one.
+    return [result for payload in payloads for result in await insert_movies([payload])]
+
+
+async def import_movies(request: Request) -> AsyncIterator[bytes]:
+    chunk = []
+    async for line in iter_lines(request):
+        chunk.append(line)
+        if len(chunk) >= MOVIE_BULK_CHUNK_SIZE:
+            yield b''.join(orjson.dumps(result) + b'\n' for result in await import_chunk(chunk))
+            chunk = []
+    if chunk:
+        yield b''.join(orjson.dumps(result) + b'\n' for result in await import_chunk(chunk))
+
+
+@movies.post('/bulk')
+async def create_movies_bulk(request: Request):
+    """Import an NDJSON stream of movies, answering with one NDJSON result per line.
+
+    Results are streamed while the upload is still being read, so clients should read
+    the response concurrently (curl does) when importing more than a few thousand lines.
+    """
+    return DuplexStreamingResponse(import_movies(request), media_type='application/x-ndjson')
 
 
 @movies.get('/', response_model=List[MovieOut])
-async def get_movies():
-    return await db_manager.get_all_movies()
+async def get_movies(
+    after: int = Query(0, ge=0, description='Return movies with an id greater than this cursor'),
+    limit: int = Query(100, ge=1, le=1000),
+    genre: Optional[List[str]] = Query(None, description='Only movies having all of these genres'),
+    cast_id: Optional[List[int]] = Query(None, description='Only movies featuring all of these casts'),
+    if_none_match: Optional[str] = Header(None),
+):
+    # Read before the page: a write in between only makes the next poll download again.
+    etag = f'"movies-{await db_manager.get_collection_version()}"'
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    headers = {'ETag': etag}
+
+    page = await db_manager.get_all_movies(after, limit + 1, genre, cast_id)
+    if len(page) > limit:
+        page = page[:limit]
+        headers['X-Next-Cursor'] = str(page[-1]['id'])
+    # Rows are serialized as they come; response_model only documents the schema here.
+    return ORJSONResponse([movie_dict(movie) for movie in page], headers=headers)
+
+
+async def export_movies_ndjson(genres: Optional[List[str]], casts_id: Optional[List[int]]) -> AsyncIterator[bytes]:
+    lines = []
+    async for movie in db_manager.iterate_movies(genres, casts_id):
+        lines.append(orjson.dumps(movie_dict(movie)))
+        if len(lines) >= MOVIE_EXPORT_BATCH_ROWS:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+@movies.get('/export')
+async def export_movies(genre: Optional[List[str]] = Query(None), cast_id: Optional[List[int]] = Query(None)):
+    """Stream the whole catalogue, or its filtered part, as NDJSON ordered by id."""
+    return StreamingResponse(export_movies_ndjson(genre, cast_id), media_type='application/x-ndjson')
 
 
 @movies.get('/{id}/', response_model=MovieOut)
-async def get_movie(id: int):
-    movie = await db_manager.get_movie(id)
-    if not movie:
+async def get_movie(id: int, if_none_match: Optional[str] = Header(None)):
+    async def current_etag():
+        # Writes made through other workers bump the version too.
+        version = await db_manager.get_movie_version(id)
+        return movie_etag(id, version) if version is not None else None
+
+    async def load():
+        movie = await db_manager.get_movie(id)
+        return response_cache.pack(movie_etag(id, movie['version']), orjson.dumps(movie_dict(movie))) if movie else None
+
+    entry = await response_cache.get_or_load_current(movie_key(id), current_etag, load)
+    if entry is None:
         raise HTTPException(status_code=404, detail='Movie not found')
-    return movie
+    etag, body = response_cache.unpack(entry)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type='application/json', headers={'ETag': etag})
 
 
 @movies.put('/{id}/', response_model=MovieOut)
 async def update_movie(id: int, payload: MovieUpdate):
-    movie = await db_manager.get_movie(id)
-    if not movie:
-        raise HTTPException(status_code=404, detail='Movie not found')
-
     update_data = payload.dict(exclude_unset=True)
 
     if 'casts_id' in update_data:
-        for cast_id in payload.casts_id:
-            if not is_cast_present(cast_id):
-                raise HTTPException(
-                    status_code=404, detail=f'Cast with given id:{cast_id} not found'
-                )
-
-    movie_in_db = MovieIn(**movie)
-
-    updated_movie = movie_in_db.copy(update=update_data)
+        missing = await missing_casts(payload.casts_id)
+        if missing:
+            raise HTTPException(
+                status_code=404, detail=f'Cast with given id:{missing[0]} not found'
+            )
 
-    return await db_manager.update_movie(id, updated_movie)
+    movie = await db_manager.update_movie(id, update_data)
+    if not movie:
+        raise HTTPException(status_code=404, detail='Movie not found')
+    await response_cache.invalidate(movie_key(id))
+    return movie
 
 
-@movies.delete('/{id}/', response_model=None)
+@movies.delete('/{id}/', response_model=MovieOut)
 async def delete_movie(id: int):
-    movie = await db_manager.get_movie(id)
+    movie = await db_manager.delete_movie(id)
     if not movie:
         raise HTTPException(status_code=404, detail='Movie not found')
-    return await db_manager.delete_movie(id)
+    await response_cache.invalidate(movie_key(id))
+    return movie
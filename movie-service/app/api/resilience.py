@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CastServiceUnavailable(httpx.HTTPError):
+    """Raised instead of calling cast-service while the breaker is open, or when a call fails or times out."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and fails calls fast for `reset_timeout`.
+
+    After that a single probe call is let through (half-open): its success closes the
+    breaker again, its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.opens = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def release_probe(self):
+        """Lets the next call probe again, for a probe that ended without an answer either way."""
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opens += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """The last `size` call latencies, for percentile-based hedging delays."""
+
+    def __init__(self, size: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self.samples) < 50:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ResilientCaller:
+    """Runs idempotent cast-service calls with a deadline, a circuit breaker and optional hedging.
+
+    With `hedge_percentile` set, a second identical call is started once the first has
+    been running for longer than that percentile of recent latencies; whichever
+    answers first is used and the other one is cancelled.
+    """
+
+    def __init__(self, timeout: float, breaker: CircuitBreaker, hedge_percentile: float = 0):
+        self.timeout = timeout
+        self.breaker = breaker
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyWindow()
+        self.outcomes: Dict[str, int] = {'success': 0, 'failure': 0, 'timeout': 0, 'rejected': 0}
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        if not self.breaker.allow():
+            self.outcomes['rejected'] += 1
+            raise CastServiceUnavailable('Cast service circuit breaker is open')
+        probe = self.breaker.state == HALF_OPEN
+        start = time.monotonic()
+        # Any exit other than a non-5xx response or a cancellation is a failure: a half-open
+        # breaker must always learn how its probe ended.
+        outcome: Optional[str] = 'failure'
+        try:
+            try:
+                response = await asyncio.wait_for(self.hedged(send), self.timeout)
+            except asyncio.CancelledError:
+                # The caller went away, e.g. a client disconnect: that says nothing about cast-service.
+                outcome = None
+                raise
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+                raise CastServiceUnavailable(f'Cast service did not answer within {self.timeout}s')
+            except httpx.HTTPError as e:
+                raise CastServiceUnavailable(f'Cast service call failed: {e}') from e
+            if response.status_code < 500:
+                outcome = 'success'
+            return response
+        finally:
+            if outcome is None:
+                if probe:
+                    self.breaker.release_probe()
+            else:
+                self.outcomes[outcome] += 1
+                if outcome == 'success':
+                    self.breaker.record_success()
+                    self.latencies.observe(time.monotonic() - start)
+                else:
+                    self.breaker.record_failure()
+
+    async def hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        delay = self.latencies.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        first = asyncio.ensure_future(send())
+        if delay is None:
+            return await first
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(send()))
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    # A failed attempt only counts once the other one has failed as well.
+                    if task.exception() is None or not tasks:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'breaker_state': self.breaker.state,
+            'breaker_opens': self.breaker.opens,
+            'outcomes': dict(self.outcomes),
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+        }
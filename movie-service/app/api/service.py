@@ -1,10 +1,286 @@
+import asyncio
+import logging
 import os
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
 import httpx
 
+from app.api.cast_cache import CastCache
+from app.api.cast_index import CastIndex
+from app.api.resilience import CastServiceUnavailable, CircuitBreaker, ResilientCaller
+
+logger = logging.getLogger(__name__)
+
 CAST_SERVICE_HOST_URL = 'http://localhost:8002/api/v1/casts/'
+CAST_SERVICE_MAX_CONNECTIONS = int(os.environ.get('CAST_SERVICE_MAX_CONNECTIONS', '20'))
+CAST_SERVICE_MAX_KEEPALIVE = int(os.environ.get('CAST_SERVICE_MAX_KEEPALIVE', '10'))
+# Ids per batch lookup (cast-service accepts up to 1000) and concurrent batches per movie.
+CAST_BATCH_SIZE = int(os.environ.get('CAST_BATCH_SIZE', '500'))
+CAST_CHECK_CONCURRENCY = int(os.environ.get('CAST_CHECK_CONCURRENCY', '10'))
+# Cast existence cache. Missing ids get a short TTL so new casts show up quickly.
+CAST_CACHE_SIZE = int(os.environ.get('CAST_CACHE_SIZE', '100000'))
+CAST_CACHE_POSITIVE_TTL = float(os.environ.get('CAST_CACHE_POSITIVE_TTL', '300'))
+CAST_CACHE_NEGATIVE_TTL = float(os.environ.get('CAST_CACHE_NEGATIVE_TTL', '5'))
+# Optional ids to preload at startup, as ids and inclusive ranges, e.g. "1-5000,7001".
+CAST_CACHE_WARM_IDS = os.environ.get('CAST_CACHE_WARM_IDS', '')
+
+# Deadline of a cast-service call, hedges included.
+CAST_SERVICE_TIMEOUT = float(os.environ.get('CAST_SERVICE_TIMEOUT', '2'))
+# Consecutive failures that open the breaker, and how long it then fails fast.
+CAST_BREAKER_FAILURES = int(os.environ.get('CAST_BREAKER_FAILURES', '5'))
+CAST_BREAKER_RESET_SECONDS = float(os.environ.get('CAST_BREAKER_RESET_SECONDS', '10'))
+# Latency percentile after which a call is hedged with a second one; 0 disables hedging.
+CAST_HEDGE_PERCENTILE = float(os.environ.get('CAST_HEDGE_PERCENTILE', '0'))
+# Local replica of cast-service's ids, kept up to date from its change feed.
+CAST_INDEX_ENABLED = os.environ.get('CAST_INDEX_ENABLED', '1') == '1'
+CAST_INDEX_REFRESH_SECONDS = float(os.environ.get('CAST_INDEX_REFRESH_SECONDS', '1'))
+# Periodic full reloads bound the effect of changes a poll can miss, e.g. ones committed out of order.
+CAST_INDEX_RESYNC_SECONDS = float(os.environ.get('CAST_INDEX_RESYNC_SECONDS', '600'))
+# The replica is not trusted once it has not been refreshed for this long.
+CAST_INDEX_MAX_STALENESS_SECONDS = float(os.environ.get('CAST_INDEX_MAX_STALENESS_SECONDS', '30'))
+CAST_INDEX_PAGE_SIZE = int(os.environ.get('CAST_INDEX_PAGE_SIZE', '10000'))
+# The bitmap takes CAST_INDEX_MAX_ID / 8 bytes at most; larger ids are looked up over HTTP.
+CAST_INDEX_MAX_ID = int(os.environ.get('CAST_INDEX_MAX_ID', '100000000'))
+# Merge the cast lookups of concurrent requests into shared batch requests.
+CAST_COALESCE_LOOKUPS = os.environ.get('CAST_COALESCE_LOOKUPS', '1') == '1'
+
+cast_cache = CastCache(CAST_CACHE_SIZE, CAST_CACHE_POSITIVE_TTL, CAST_CACHE_NEGATIVE_TTL)
+cast_caller = ResilientCaller(
+    CAST_SERVICE_TIMEOUT, CircuitBreaker(CAST_BREAKER_FAILURES, CAST_BREAKER_RESET_SECONDS), CAST_HEDGE_PERCENTILE,
+)
+
+# Shared keep-alive pool, opened and closed by the app's startup and shutdown hooks.
+client: Optional[httpx.AsyncClient] = None
+
+
+async def open_client():
+    global client
+    client = httpx.AsyncClient(
+        timeout=CAST_SERVICE_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=CAST_SERVICE_MAX_CONNECTIONS, max_keepalive_connections=CAST_SERVICE_MAX_KEEPALIVE,
+        )
+    )
+
+
+async def close_client():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
+
+
+def cast_service_url() -> str:
+    return os.environ.get('CAST_SERVICE_HOST_URL') or CAST_SERVICE_HOST_URL
+
+
+async def fetch_missing_casts(cast_ids: List[int]) -> List[int]:
+    # One round trip to cast-service's batch lookup for the whole list.
+    ids = ','.join(str(cast_id) for cast_id in cast_ids)
+    r = await cast_caller.call(lambda: client.get(cast_service_url(), params={'ids': ids}))
+    r.raise_for_status()
+    return r.json()['missing']
+
+
+async def fetch_missing_batched(cast_ids: List[int]) -> Set[int]:
+    semaphore = asyncio.Semaphore(CAST_CHECK_CONCURRENCY)
+
+    async def check(batch: List[int]) -> List[int]:
+        async with semaphore:
+            return await fetch_missing_casts(batch)
+
+    batches = [cast_ids[i:i + CAST_BATCH_SIZE] for i in range(0, len(cast_ids), CAST_BATCH_SIZE)]
+    fetched = await asyncio.gather(*(check(batch) for batch in batches))
+    return {cast_id for batch in fetched for cast_id in batch}
+
+
+class CastLoader:
+    """Coalesces the cast lookups of concurrent callers, dataloader style.
+
+    Ids requested during one event loop tick are sent to cast-service together on
+    the next one, and an id that is already being looked up is not sent again: its
+    callers share the pending result.
+    """
+
+    def __init__(self):
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.in_flight: Dict[int, asyncio.Future] = {}
+        self.dispatches = 0
+
+    async def load_many(self, cast_ids: List[int]) -> Dict[int, bool]:
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for cast_id in cast_ids:
+            future = self.in_flight.get(cast_id) or self.pending.get(cast_id)
+            if future is None:
+                if not self.pending:
+                    loop.call_soon(self.dispatch)
+                future = self.pending[cast_id] = loop.create_future()
+            futures[cast_id] = future
+        # Shielded, so that a cancelled caller does not cancel the lookup for the others.
+        results = await asyncio.gather(*(asyncio.shield(future) for future in futures.values()))
+        return dict(zip(futures, results))
+
+    def dispatch(self):
+        batch, self.pending = self.pending, {}
+        self.in_flight.update(batch)
+        self.dispatches += 1
+        asyncio.ensure_future(self.resolve(batch))
+
+    async def resolve(self, batch: Dict[int, asyncio.Future]):
+        try:
+            not_found = await fetch_missing_batched(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+        else:
+            for cast_id, future in batch.items():
+                cast_cache.set(cast_id, cast_id not in not_found)
+                future.set_result(cast_id not in not_found)
+        finally:
+            for cast_id, future in batch.items():
+                del self.in_flight[cast_id]
+                # Only left pending if this task was cancelled, e.g. at shutdown; its callers must not hang.
+                if not future.done():
+                    future.set_exception(CastServiceUnavailable('Cast lookup was cancelled'))
+
+
+cast_loader = CastLoader()
+
+
+async def fetch_cast_snapshot(index: CastIndex) -> int:
+    # Every current id, then the change feed cursor of the first page to follow them from.
+    after, cursor = 0, None
+    while True:
+        r = await cast_caller.call(
+            lambda: client.get(f'{cast_service_url()}ids', params={'after': after, 'limit': CAST_INDEX_PAGE_SIZE})
+        )
+        r.raise_for_status()
+        page = r.json()
+        index.apply(page['ids'], ())
+        cursor = page['cursor'] if cursor is None else cursor
+        if not page['more']:
+            return cursor
+        after = page['ids'][-1]
+
+
+async def fetch_cast_changes(index: CastIndex, cursor: int) -> int:
+    while True:
+        r = await cast_caller.call(
+            lambda: client.get(f'{cast_service_url()}changes', params={'since': cursor, 'limit': CAST_INDEX_PAGE_SIZE})
+        )
+        r.raise_for_status()
+        page = r.json()
+        index.apply(page['inserted'], page['deleted'])
+        cursor = page['cursor']
+        if not page['more']:
+            return cursor
+
+
+class CastIndexReplica:
+    """Keeps a CastIndex of every cast id in sync with cast-service's change feed.
+
+    A snapshot of the current ids is followed by incremental polls of the changes
+    made since, every CAST_INDEX_REFRESH_SECONDS.
+    Ids the replica does not know, or all ids while it is stale, fall back to HTTP.
+    """
+
+    def __init__(self):
+        self.index: Optional[CastIndex] = None
+        self.cursor = 0
+        self.loaded_at = 0.0
+        self.synced_at = 0.0
+        self.hits = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def contains(self, cast_id: int) -> bool:
+        if self.index is None or time.monotonic() - self.synced_at > CAST_INDEX_MAX_STALENESS_SECONDS:
+            return False
+        if cast_id in self.index:
+            self.hits += 1
+            return True
+        return False
+
+    async def refresh(self):
+        if self.index is None or time.monotonic() - self.loaded_at >= CAST_INDEX_RESYNC_SECONDS:
+            # Built aside and swapped in, so lookups keep using the current index meanwhile.
+            index = CastIndex(CAST_INDEX_MAX_ID)
+            self.cursor = await fetch_cast_changes(index, await fetch_cast_snapshot(index))
+            self.index, self.loaded_at = index, time.monotonic()
+        else:
+            self.cursor = await fetch_cast_changes(self.index, self.cursor)
+        self.synced_at = time.monotonic()
+
+    async def run(self):
+        delay = CAST_INDEX_REFRESH_SECONDS
+        while True:
+            try:
+                await self.refresh()
+                delay = CAST_INDEX_REFRESH_SECONDS
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                logger.warning('Could not refresh the cast index, retrying in %.0fs: %s', delay, e)
+                delay = min(delay * 2, 60)
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if CAST_INDEX_ENABLED and self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'enabled': CAST_INDEX_ENABLED,
+            'ready': self.index is not None,
+            'cursor': self.cursor,
+            'hits': self.hits,
+            'seconds_since_sync': time.monotonic() - self.synced_at if self.synced_at else None,
+            **(self.index.stats() if self.index is not None else {}),
+        }
+
+
+cast_replica = CastIndexReplica()
+
+
+async def missing_casts(cast_ids: Iterable[int]) -> List[int]:
+    ids = list(dict.fromkeys(cast_ids))
+    # Replica first: a local bit test. Anything it does not know goes to the cache, then to HTTP.
+    known = {cast_id: True if cast_replica.contains(cast_id) else cast_cache.get(cast_id) for cast_id in ids}
+    unknown = [cast_id for cast_id, present in known.items() if present is None]
+
+    if unknown and CAST_COALESCE_LOOKUPS:
+        known.update(await cast_loader.load_many(unknown))
+    elif unknown:
+        not_found = await fetch_missing_batched(unknown)
+        for cast_id in unknown:
+            known[cast_id] = cast_id not in not_found
+            cast_cache.set(cast_id, known[cast_id])
+
+    return [cast_id for cast_id in ids if not known[cast_id]]
+
+
+def parse_id_ranges(spec: str) -> List[int]:
+    ids: List[int] = []
+    for part in filter(None, (part.strip() for part in spec.split(','))):
+        start, _, end = part.partition('-')
+        ids.extend(range(int(start), int(end or start) + 1))
+    return ids
 
 
-def is_cast_present(cast_id: int):
-    url = os.environ.get('CAST_SERVICE_HOST_URL') or CAST_SERVICE_HOST_URL
-    r = httpx.get(f'{url}{cast_id}')
-    return True if r.status_code == 200 else False
+async def warm_cast_cache():
+    ids = parse_id_ranges(CAST_CACHE_WARM_IDS)
+    if not ids:
+        return
+    try:
+        await missing_casts(ids)
+    except httpx.HTTPError as e:
+        # A cold cache is only slower, so startup goes on without it.
+        logger.warning('Could not warm the cast cache: %s', e)
@@ -1,20 +1,42 @@
-from fastapi import FastAPI
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from app.api.movies import movies
-from app.api.db import metadata, database, engine
+from app.api.internal import internal
+from app.api.db import metadata, database, engine, create_missing_indexes, create_version_tracking
+from app.api import service
 
 metadata.create_all(engine)
+create_missing_indexes()
+create_version_tracking()
 
-app = FastAPI(openapi_url='/api/v1/movies/openapi.json', docs_url='/api/v1/movies/docs')
+app = FastAPI(
+    openapi_url='/api/v1/movies/openapi.json',
+    docs_url='/api/v1/movies/docs',
+    default_response_class=ORJSONResponse,
+)
+
+
+@app.exception_handler(httpx.HTTPError)
+async def cast_service_error(request: Request, exc: httpx.HTTPError):
+    # Timeouts, open breaker and upstream errors of cast-service calls.
+    return ORJSONResponse(status_code=503, content={'detail': 'Cast service unavailable'}, headers={'Retry-After': '1'})
 
 
 @app.on_event('startup')
 async def startup():
     await database.connect()
+    await service.open_client()
+    await service.warm_cast_cache()
+    service.cast_replica.start()
 
 
 @app.on_event('shutdown')
 async def shutdown():
+    await service.cast_replica.stop()
+    await service.close_client()
     await database.disconnect()
 
 
 app.include_router(movies, prefix='/api/v1/movies', tags=['movies'])
+app.include_router(internal, prefix='/api/v1/movies/internal', tags=['internal'])
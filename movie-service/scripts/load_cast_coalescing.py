@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Count cast-service requests made by concurrent movie writes, with and without coalescing.
+
+Run from the movie-service directory (no services or database needed):
+
+    python scripts/load_cast_coalescing.py --writers 200 --waves 20 --casts-per-movie 10 --hot-casts 50
+
+cast-service is replaced by an httpx.MockTransport that answers the batch lookup
+after --latency-ms and counts requests. In each wave, --writers concurrent callers
+run `service.missing_casts` for a movie whose casts are drawn from --hot-casts ids.
+The cast cache is disabled, so every wave goes upstream as it would on a cold start
+or once negative entries expire. Upstream requests and ids and caller latencies are
+printed as JSON for both modes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api import service  # noqa: E402
+from app.api.cast_cache import CastCache  # noqa: E402
+
+
+async def run_mode(args, coalesce):
+    upstream = {'requests': 0, 'ids': 0}
+
+    async def handler(request):
+        ids = [int(cast_id) for cast_id in request.url.params['ids'].split(',')]
+        upstream['requests'] += 1
+        upstream['ids'] += len(ids)
+        await asyncio.sleep(args.latency_ms / 1000)
+        return httpx.Response(200, json={'casts': [], 'missing': [cast_id for cast_id in ids if cast_id % 10 == 0]})
+
+    service.CAST_COALESCE_LOOKUPS = coalesce
+    service.cast_cache = CastCache(0, 0, 0)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    rng = random.Random(args.seed)
+    latencies = []
+
+    async def writer(cast_ids):
+        start = time.perf_counter()
+        missing = await service.missing_casts(cast_ids)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert missing == [cast_id for cast_id in dict.fromkeys(cast_ids) if cast_id % 10 == 0]
+
+    try:
+        for _ in range(args.waves):
+            movies = [rng.sample(range(1, args.hot_casts + 1), args.casts_per_movie) for _ in range(args.writers)]
+            await asyncio.gather(*(writer(cast_ids) for cast_ids in movies))
+    finally:
+        await service.close_client()
+
+    latencies.sort()
+    calls = args.writers * args.waves
+    return {
+        'upstream_requests': upstream['requests'],
+        'upstream_ids': upstream['ids'],
+        'upstream_requests_per_write': upstream['requests'] / calls,
+        'p50_ms': statistics.median(latencies),
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=200, help='concurrent movie writes per wave')
+    parser.add_argument('--waves', type=int, default=20)
+    parser.add_argument('--casts-per-movie', type=int, default=10)
+    parser.add_argument('--hot-casts', type=int, default=50, help='size of the cast id pool writes draw from')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='simulated cast-service latency')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = {
+        'writes': args.writers * args.waves,
+        'independent': asyncio.run(run_mode(args, coalesce=False)),
+        'coalesced': asyncio.run(run_mode(args, coalesce=True)),
+    }
+    report['request_reduction'] = report['independent']['upstream_requests'] / report['coalesced']['upstream_requests']
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Exercise the cast-service client's deadline, circuit breaker and hedging against the stub cast-service.
+
+Run from the movie-service directory (no services or database needed):
+
+    python scripts/resilience_check.py --calls 2000 --concurrency 10
+
+scripts/stub_cast_service.py is started on a free port, and `service.fetch_missing_casts`
+is called through a fresh ResilientCaller for each scenario:
+
+- slow_tail: 5 ms answers with 5% taking 300 ms, without and with hedging at p90;
+- outage: every call fails with a 503, then cast-service recovers and a probe closes the breaker;
+- hang: cast-service stops answering within the deadline.
+
+Latencies, call outcomes, breaker state and the number of requests that reached the
+stub are printed as JSON for every phase.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api import service  # noqa: E402
+from app.api.resilience import CircuitBreaker, ResilientCaller  # noqa: E402
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else None
+
+
+def start_stub():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    stub = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), 'stub_cast_service.py'),
+                             '--port', str(port)])
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            httpx.post(f'{base_url}/_control', json={})
+            return stub, base_url
+        except httpx.TransportError:
+            if stub.poll() is not None or time.monotonic() > deadline:
+                stub.kill()
+                sys.exit('stub cast-service did not start')
+            time.sleep(0.05)
+
+
+async def phase(base_url, caller, calls, concurrency, **stub_settings):
+    control = f'{base_url}/_control'
+    served_before = (await service.client.post(control, json=stub_settings)).json()['requests']
+    service.cast_caller = caller
+    latencies = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await service.fetch_missing_casts([random.randint(1, 10000)])
+            except httpx.HTTPError:
+                failures += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(call() for _ in range(calls)))
+    latencies.sort()
+    served = (await service.client.post(control, json={})).json()['requests'] - served_before
+    return {
+        'calls': calls,
+        'failed': failures,
+        'upstream_requests': served,
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1],
+        **caller.stats(),
+    }
+
+
+async def run(args, base_url):
+    os.environ['CAST_SERVICE_HOST_URL'] = f'{base_url}/api/v1/casts/'
+    await service.open_client()
+    try:
+        def caller(hedge_percentile=0):
+            breaker = CircuitBreaker(args.breaker_failures, args.breaker_reset)
+            return ResilientCaller(args.timeout, breaker, hedge_percentile)
+
+        tail = {'latency_ms': 5, 'slow_ratio': 0.05, 'slow_ms': 300, 'error_rate': 0}
+        report = {
+            'slow_tail': {
+                'no_hedging': await phase(base_url, caller(), args.calls, args.concurrency, **tail),
+                'hedging_p90': await phase(base_url, caller(90), args.calls, args.concurrency, **tail),
+            },
+        }
+
+        outage = caller()
+        report['outage'] = {
+            'down': await phase(base_url, outage, args.calls // 4, args.concurrency, slow_ratio=0, error_rate=1),
+        }
+        await asyncio.sleep(args.breaker_reset)
+        # While half-open only one probe gets through, so let it close the breaker first.
+        report['outage']['probe'] = await phase(base_url, outage, 1, 1, error_rate=0)
+        report['outage']['recovered'] = await phase(base_url, outage, args.calls // 4, args.concurrency)
+
+        report['hang'] = await phase(base_url, caller(), args.calls // 20, args.concurrency, latency_ms=60000)
+        await service.client.post(f'{base_url}/_control', json={'latency_ms': 5})
+    finally:
+        await service.close_client()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000, help='calls in each slow_tail phase')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=0.5, help='per-call deadline in seconds')
+    parser.add_argument('--breaker-failures', type=int, default=5)
+    parser.add_argument('--breaker-reset', type=float, default=1.0, help='seconds the breaker stays open')
+    args = parser.parse_args()
+
+    stub, base_url = start_stub()
+    try:
+        report = asyncio.run(run(args, base_url))
+    finally:
+        stub.terminate()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
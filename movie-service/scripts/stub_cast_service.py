@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Stand-in for cast-service that injects latency and errors, for exercising movie-service's cast client.
+
+Run from the movie-service directory:
+
+    python scripts/stub_cast_service.py --port 8002 --latency-ms 5 --slow-ratio 0.05 --slow-ms 300
+
+It answers GET /api/v1/casts/{id}/ and the batch lookup GET /api/v1/casts/?ids=1,2,3
+without a database: ids divisible by 10 are missing, every other id exists. Each
+request waits --latency-ms, or --slow-ms for a --slow-ratio share of requests, and
+fails with a 503 for an --error-rate share. POST /_control with a JSON object of any
+of these settings changes them at runtime; it returns the current settings and the
+number of cast requests served so far.
+"""
+
+import argparse
+import asyncio
+import random
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query
+
+settings = {'latency_ms': 5.0, 'slow_ratio': 0.0, 'slow_ms': 300.0, 'error_rate': 0.0}
+served = {'requests': 0}
+app = FastAPI()
+
+
+async def behave():
+    served['requests'] += 1
+    slow = random.random() < settings['slow_ratio']
+    await asyncio.sleep((settings['slow_ms'] if slow else settings['latency_ms']) / 1000)
+    if random.random() < settings['error_rate']:
+        raise HTTPException(status_code=503, detail='Injected error')
+
+
+@app.post('/_control')
+async def control(changes: dict):
+    settings.update({key: float(value) for key, value in changes.items() if key in settings})
+    return {**settings, **served}
+
+
+@app.get('/api/v1/casts/{id}/')
+async def get_cast(id: int):
+    await behave()
+    if id % 10 == 0:
+        raise HTTPException(status_code=404, detail='Cast not found')
+    return {'id': id, 'name': f'cast {id}', 'nationality': None}
+
+
+@app.get('/api/v1/casts/')
+async def get_casts(ids: str = Query(...)):
+    await behave()
+    cast_ids = [int(id) for id in ids.split(',') if id.strip()]
+    return {
+        'casts': [{'id': id, 'name': f'cast {id}', 'nationality': None} for id in cast_ids if id % 10],
+        'missing': [id for id in cast_ids if id % 10 == 0],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8002)
+    for name, default in settings.items():
+        parser.add_argument(f'--{name.replace("_", "-")}', type=float, default=default)
+    args = parser.parse_args()
+    settings.update({name: getattr(args, name) for name in settings})
+    uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning')
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# Run from the movie-service folder (`python -m pytest tests`); no database or cast-service is needed.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# app.api.db builds its engine at import, but nothing here connects to it.
+os.environ.setdefault('DATABASE_URI', 'postgresql://localhost/movie_db')
+
+
+@pytest.fixture
+def client():
+    """A TestClient for the movies routes alone; app.main would create the tables at import."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.movies import movies
+
+    app = FastAPI()
+    app.include_router(movies, prefix='/api/v1/movies')
+    return TestClient(app)
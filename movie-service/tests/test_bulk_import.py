@@ -0,0 +1,68 @@
+import orjson
+
+from app.api import movies
+
+
+def movie_line(name, casts_id=(1,)):
+    return orjson.dumps({'name': name, 'plot': 'p', 'genres': ['drama'], 'casts_id': list(casts_id)})
+
+
+def stub_writes(monkeypatch):
+    """Stubs cast lookups (ids divisible by 10 are missing) and inserts; returns the inserted names."""
+    inserted = []
+
+    async def missing_casts(cast_ids):
+        return sorted({cast_id for cast_id in cast_ids if cast_id % 10 == 0})
+
+    async def insert_movies(payloads):
+        inserted.extend(payload.name for payload in payloads)
+        return [{'id': len(inserted) - len(payloads) + i + 1} for i in range(len(payloads))]
+
+    monkeypatch.setattr(movies, 'missing_casts', missing_casts)
+    monkeypatch.setattr(movies, 'insert_movies', insert_movies)
+    return inserted
+
+
+def post_bulk(client, *chunks):
+    response = client.post('/api/v1/movies/bulk', data=(chunk for chunk in chunks))
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_one_result_per_line(client, monkeypatch):
+    monkeypatch.setattr(movies, 'MOVIE_BULK_CHUNK_SIZE', 2)
+    inserted = stub_writes(monkeypatch)
+    body = b'\n'.join([movie_line('a'), b'{"name": ', movie_line('c', [3, 10]), b'', movie_line('e')]) + b'\n'
+
+    # Chunk boundaries fall inside lines.
+    results = post_bulk(client, body[:10], body[10:50], body[50:])
+    assert [result['line'] for result in results] == [1, 2, 3, 5]
+    assert results[0] == {'line': 1, 'id': 1}
+    assert 'error' in results[1]
+    assert results[2] == {'line': 3, 'error': 'Cast with given id:10 not found'}
+    assert results[3] == {'line': 5, 'id': 2}
+    assert inserted == ['a', 'e']
+
+
+def test_overlong_lines_are_reported_and_skipped(client, monkeypatch):
+    monkeypatch.setattr(movies, 'MOVIE_BULK_MAX_LINE_BYTES', 100)
+    inserted = stub_writes(monkeypatch)
+    long_line = movie_line('b' * 200)
+
+    # The long line arrives over several chunks, none of them containing all of it.
+    results = post_bulk(
+        client, movie_line('a') + b'\n' + long_line[:60], long_line[60:120], long_line[120:] + b'\n' + movie_line('c'),
+    )
+    assert results == [
+        {'line': 1, 'id': 1},
+        {'line': 2, 'error': 'Line is longer than 100 bytes'},
+        {'line': 3, 'id': 2},
+    ]
+    assert inserted == ['a', 'c']
+
+    # A line that arrives whole, and a last line without a newline, are capped as well.
+    results = post_bulk(client, long_line + b'\n' + movie_line('d') + b'\n', long_line)
+    errors = [result.get('error') for result in results]
+    assert errors == ['Line is longer than 100 bytes', None, 'Line is longer than 100 bytes']
+    assert inserted == ['a', 'c', 'd']
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+from app.api import service
+from app.api.cast_index import CastIndex
+
+
+def test_add_and_discard():
+    index = CastIndex(max_id=1000)
+    index.apply([1, 8, 9, 9, 700], [8, 42])
+    assert [cast_id for cast_id in range(1001) if cast_id in index] == [1, 9, 700]
+    assert index.count == 3
+    assert -1 not in index and 5000 not in index
+
+
+def test_ids_above_max_id_are_not_stored():
+    index = CastIndex(max_id=63)
+    index.apply([63, 64, 10 ** 9], [])
+    assert 63 in index and 64 not in index
+    assert index.stats() == {'ids': 1, 'bytes': 8, 'max_id': 63, 'ignored_ids': 2}
+
+
+class FakeCastService:
+    """Serves /ids and /changes over an in-memory set of casts and change log."""
+
+    def __init__(self, ids):
+        self.ids = sorted(ids)
+        self.log = [(seq, cast_id, 'I') for seq, cast_id in enumerate(self.ids, 1)]
+        self.requests = []
+
+    def change(self, cast_id, op):
+        self.log.append((len(self.log) + 1, cast_id, op))
+        self.ids = sorted(set(self.ids) | {cast_id} if op == 'I' else set(self.ids) - {cast_id})
+
+    def handle(self, request):
+        params = request.url.params
+        self.requests.append((request.url.path.rsplit('/', 1)[-1], dict(params)))
+        limit = int(params['limit'])
+        if request.url.path.endswith('/ids'):
+            ids = [cast_id for cast_id in self.ids if cast_id > int(params['after'])][:limit]
+            return httpx.Response(200, json={'ids': ids, 'cursor': len(self.log), 'more': len(ids) == limit})
+        changes = [change for change in self.log if change[0] > int(params['since'])][:limit]
+        return httpx.Response(
+            200,
+            json={
+                'inserted': [cast_id for _, cast_id, op in changes if op == 'I'],
+                'deleted': [cast_id for _, cast_id, op in changes if op == 'D'],
+                'cursor': changes[-1][0] if changes else int(params['since']),
+                'more': len(changes) == limit,
+            },
+        )
+
+
+def run_with(fake, main, monkeypatch):
+    monkeypatch.setattr(service, 'CAST_INDEX_PAGE_SIZE', 2)
+
+    async def wrapped():
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+        try:
+            await main()
+        finally:
+            await service.close_client()
+
+    asyncio.run(wrapped())
+
+
+def test_replica_bootstraps_from_a_snapshot_and_follows_the_feed(monkeypatch):
+    fake = FakeCastService([1, 2, 3, 5, 8])
+    replica = service.CastIndexReplica()
+
+    async def main():
+        await replica.refresh()
+        assert [cast_id for cast_id in range(10) if replica.contains(cast_id)] == [1, 2, 3, 5, 8]
+        # The log is never replayed from its start.
+        assert ('changes', {'since': '0', 'limit': '2'}) not in fake.requests
+        assert replica.cursor == 5
+
+        fake.change(9, 'I')
+        fake.change(2, 'D')
+        await replica.refresh()
+        assert [cast_id for cast_id in range(10) if replica.contains(cast_id)] == [1, 3, 5, 8, 9]
+
+    run_with(fake, main, monkeypatch)
+
+
+def test_resync_rebuilds_the_index(monkeypatch):
+    fake = FakeCastService([1, 2])
+    replica = service.CastIndexReplica()
+
+    async def main():
+        await replica.refresh()
+        first = replica.index
+        # A change the feed never reports, e.g. one committed out of order, is fixed by the resync.
+        fake.ids = [2, 4]
+        monkeypatch.setattr(service, 'CAST_INDEX_RESYNC_SECONDS', 0)
+        await replica.refresh()
+        assert replica.index is not first
+        assert [cast_id for cast_id in range(6) if replica.contains(cast_id)] == [2, 4]
+
+    run_with(fake, main, monkeypatch)
@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api import service
+from app.api.cast_cache import CastCache
+from app.api.resilience import CastServiceUnavailable, CircuitBreaker, ResilientCaller
+
+
+def resolve_tasks():
+    return [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == 'CastLoader.resolve']
+
+
+def test_cancelled_dispatch_fails_its_callers(monkeypatch):
+    async def hang(cast_ids):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(service, 'fetch_missing_batched', hang)
+
+    async def main():
+        loader = service.CastLoader()
+        caller = asyncio.ensure_future(loader.load_many([1, 2]))
+        await asyncio.sleep(0.01)
+        [dispatch] = resolve_tasks()
+        dispatch.cancel()
+        with pytest.raises(CastServiceUnavailable):
+            await asyncio.wait_for(caller, 1)
+        assert loader.in_flight == {}
+
+    asyncio.run(main())
+
+
+class FakeCastService:
+    """Answers cast-service's batch lookup; ids divisible by 10 are missing."""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.batches = []
+        # When set, answers wait for it.
+        self.release = None
+
+    async def handle(self, request):
+        ids = [int(cast_id) for cast_id in request.url.params['ids'].split(',')]
+        self.batches.append(ids)
+        if self.release is not None:
+            await self.release.wait()
+        return httpx.Response(self.status_code, json={'missing': [cast_id for cast_id in ids if cast_id % 10 == 0]})
+
+
+def run_with(fake, main, monkeypatch):
+    # A cold cache and breaker, and no replica, so that every lookup reaches the fake.
+    monkeypatch.setattr(service, 'cast_cache', CastCache(1000, 60, 60))
+    monkeypatch.setattr(service, 'cast_caller', ResilientCaller(5, CircuitBreaker(100, 60)))
+    monkeypatch.setattr(service, 'cast_loader', service.CastLoader())
+    monkeypatch.setattr(service, 'cast_replica', service.CastIndexReplica())
+
+    async def wrapped():
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+        try:
+            await main()
+        finally:
+            await service.close_client()
+
+    asyncio.run(wrapped())
+
+
+def test_concurrent_lookups_share_one_batch(monkeypatch):
+    fake = FakeCastService()
+
+    async def main():
+        results = await asyncio.gather(
+            service.missing_casts([1, 2, 10]), service.missing_casts([2, 3]), service.missing_casts([10, 20, 3]),
+        )
+        assert results == [[10], [], [10, 20]]
+        assert fake.batches == [[1, 2, 10, 3, 20]]
+        assert service.cast_loader.dispatches == 1
+
+        # Answers are cached, so asking again does not reach cast-service.
+        assert await service.missing_casts([1, 20]) == [20]
+        assert len(fake.batches) == 1
+
+    run_with(fake, main, monkeypatch)
+
+
+def test_ids_already_in_flight_are_not_sent_again(monkeypatch):
+    fake = FakeCastService()
+
+    async def main():
+        fake.release = asyncio.Event()
+        first = asyncio.ensure_future(service.missing_casts([1, 2]))
+        while not fake.batches:
+            await asyncio.sleep(0)
+        # 1 and 2 are being looked up, not cached yet: only 3 goes into the next batch.
+        second = asyncio.ensure_future(service.missing_casts([2, 3]))
+        while len(fake.batches) < 2:
+            await asyncio.sleep(0)
+        assert service.cast_cache.get(2) is None
+        fake.release.set()
+        assert await asyncio.gather(first, second) == [[], []]
+        assert fake.batches == [[1, 2], [3]]
+
+    run_with(fake, main, monkeypatch)
+
+
+def test_errors_reach_every_waiter(monkeypatch):
+    fake = FakeCastService(status_code=500)
+
+    async def main():
+        results = await asyncio.gather(
+            service.missing_casts([1, 2]), service.missing_casts([2, 3]), return_exceptions=True
+        )
+        assert [type(result) for result in results] == [httpx.HTTPStatusError, httpx.HTTPStatusError]
+        assert len(fake.batches) == 1
+        # Failures are not cached: the next lookup asks again.
+        fake.status_code = 200
+        assert await service.missing_casts([1, 2, 3]) == []
+        assert len(fake.batches) == 2
+
+    run_with(fake, main, monkeypatch)
@@ -0,0 +1,104 @@
+import pytest
+
+from app.api import db_manager, response_cache
+from app.api.conditional import etag_matches, not_modified
+
+
+def test_etag_matches():
+    etag = '"7-3"'
+    assert etag_matches('"7-3"', etag)
+    assert etag_matches('W/"7-3"', etag)
+    assert etag_matches('"1-1", W/"7-3"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"7-2"', etag)
+    assert not etag_matches('7-3', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('', etag)
+
+
+def test_not_modified():
+    response = not_modified('"7-3"')
+    assert response.status_code == 304
+    assert response.headers['ETag'] == '"7-3"'
+    assert response.body == b''
+
+
+class FakeMovies:
+    """The db_manager reads and the update used by the conditional GETs, over one in-memory movie."""
+
+    def __init__(self):
+        self.rows = {1: {'id': 1, 'name': 'm', 'plot': 'p', 'genres': ['drama'], 'casts_id': [1], 'version': 1}}
+        self.collection_version = 1
+        self.reads = []
+
+    async def get_movie(self, id):
+        self.reads.append('movie')
+        return self.rows.get(id)
+
+    async def get_movie_version(self, id):
+        return self.rows[id]['version'] if id in self.rows else None
+
+    async def get_collection_version(self, name='movies'):
+        return self.collection_version
+
+    async def get_all_movies(self, after=0, limit=None, genres=None, casts_id=None):
+        self.reads.append('list')
+        return [row for id, row in sorted(self.rows.items()) if id > after][:limit]
+
+    async def update_movie(self, id, values):
+        # As the row and statement triggers do.
+        self.rows[id] = {**self.rows[id], **values, 'version': self.rows[id]['version'] + 1}
+        self.collection_version += 1
+        return self.rows[id]
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeMovies()
+    for name in ['get_movie', 'get_movie_version', 'get_collection_version', 'get_all_movies', 'update_movie']:
+        monkeypatch.setattr(db_manager, name, getattr(fake, name))
+    monkeypatch.setattr(response_cache, 'backend', response_cache.LRUBackend(100, 60))
+    return fake
+
+
+def assert_not_modified(response, etag):
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.content == b''
+
+
+def test_movie_list_answers_a_matching_etag_with_304(client, fake):
+    response = client.get('/api/v1/movies/')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"movies-1"'
+    assert [movie['id'] for movie in response.json()] == [1]
+
+    # The page is not read for a 304.
+    assert_not_modified(client.get('/api/v1/movies/', headers={'If-None-Match': '"movies-1"'}), '"movies-1"')
+    assert fake.reads == ['list']
+
+
+def test_movie_answers_a_matching_etag_with_304(client, fake):
+    response = client.get('/api/v1/movies/1/')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"1-1"'
+    assert response.json() == {'id': 1, 'name': 'm', 'plot': 'p', 'genres': ['drama'], 'casts_id': [1]}
+
+    assert_not_modified(client.get('/api/v1/movies/1/', headers={'If-None-Match': '"1-1"'}), '"1-1"')
+    assert_not_modified(client.get('/api/v1/movies/1/', headers={'If-None-Match': 'W/"1-1"'}), '"1-1"')
+    assert fake.reads == ['movie']
+
+
+def test_put_changes_the_etags(client, fake):
+    assert client.get('/api/v1/movies/1/').headers['ETag'] == '"1-1"'
+    assert client.put('/api/v1/movies/1/', json={'plot': 'new plot'}).status_code == 200
+
+    response = client.get('/api/v1/movies/1/', headers={'If-None-Match': '"1-1"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"1-2"'
+    assert response.json()['plot'] == 'new plot'
+    assert_not_modified(client.get('/api/v1/movies/1/', headers={'If-None-Match': '"1-2"'}), '"1-2"')
+
+    response = client.get('/api/v1/movies/', headers={'If-None-Match': '"movies-1"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"movies-2"'
@@ -0,0 +1,47 @@
+import asyncio
+
+import orjson
+
+from app.api import db_manager, movies
+
+
+def stub_rows(monkeypatch, count):
+    """Stubs iterate_movies with `count` rows; returns the filters it was called with."""
+    calls = []
+
+    async def iterate_movies(genres=None, casts_id=None):
+        calls.append((genres, casts_id))
+        for id in range(1, count + 1):
+            yield {'id': id, 'name': f'm{id}', 'plot': 'p', 'genres': ['drama'], 'casts_id': [id], 'version': 1}
+
+    monkeypatch.setattr(db_manager, 'iterate_movies', iterate_movies)
+    return calls
+
+
+def test_export_streams_every_row_as_ndjson(client, monkeypatch):
+    count = movies.MOVIE_EXPORT_BATCH_ROWS * 2 + 1
+    calls = stub_rows(monkeypatch, count)
+
+    response = client.get('/api/v1/movies/export', params={'genre': ['drama', 'war'], 'cast_id': [3, 4]})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert calls == [(['drama', 'war'], [3, 4])]
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [row['id'] for row in rows] == list(range(1, count + 1))
+    # Only the MovieOut fields are written.
+    assert rows[0] == {'id': 1, 'name': 'm1', 'plot': 'p', 'genres': ['drama'], 'casts_id': [1]}
+
+    client.get('/api/v1/movies/export')
+    assert calls[-1] == (None, None)
+
+
+def test_export_writes_batches_of_rows(monkeypatch):
+    monkeypatch.setattr(movies, 'MOVIE_EXPORT_BATCH_ROWS', 3)
+    stub_rows(monkeypatch, 7)
+
+    async def collect():
+        return [chunk async for chunk in movies.export_movies_ndjson(None, None)]
+
+    chunks = asyncio.run(collect())
+    assert [chunk.count(b'\n') for chunk in chunks] == [3, 3, 1]
+    assert all(chunk.endswith(b'\n') for chunk in chunks)
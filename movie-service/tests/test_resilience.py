@@ -0,0 +1,163 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api import resilience
+from app.api.resilience import CLOSED, HALF_OPEN, OPEN, CastServiceUnavailable, CircuitBreaker, ResilientCaller
+
+
+def response(status_code=200):
+    return httpx.Response(status_code, request=httpx.Request('GET', 'http://cast-service/'))
+
+
+def test_breaker_transitions(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, 'monotonic', lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opens == 1
+    assert not breaker.allow()
+
+    # After the reset timeout a single probe is let through; its failure reopens the breaker.
+    now[0] += 10
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opens == 2
+    assert not breaker.allow()
+
+    # A successful probe closes it and starts the failure count over.
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_server_errors_open_the_breaker_and_calls_then_fail_fast():
+    async def main():
+        caller = ResilientCaller(5, CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        sent = []
+
+        async def send():
+            sent.append(1)
+            return response(503)
+
+        for _ in range(2):
+            assert (await caller.call(send)).status_code == 503
+        with pytest.raises(CastServiceUnavailable):
+            await caller.call(send)
+        assert len(sent) == 2
+        assert caller.stats()['outcomes'] == {'success': 0, 'failure': 2, 'timeout': 0, 'rejected': 1}
+
+    asyncio.run(main())
+
+
+def test_hedge_wins_and_the_slow_call_is_cancelled():
+    async def main():
+        caller = ResilientCaller(5, CircuitBreaker(5, 60), hedge_percentile=50)
+        for _ in range(50):
+            caller.latencies.observe(0.01)
+        attempts = []
+        cancelled = []
+
+        async def send():
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 0:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(attempt)
+                    raise
+            return response(200 + attempt)
+
+        assert (await caller.call(send)).status_code == 201
+        await asyncio.sleep(0)
+        assert attempts == [0, 1] and cancelled == [0]
+        assert (caller.hedges, caller.hedge_wins) == (1, 1)
+
+    asyncio.run(main())
+
+
+def test_no_hedge_when_the_first_call_is_fast():
+    async def main():
+        caller = ResilientCaller(5, CircuitBreaker(5, 60), hedge_percentile=50)
+        for _ in range(50):
+            caller.latencies.observe(1)
+
+        async def send():
+            return response()
+
+        assert (await caller.call(send)).status_code == 200
+        assert caller.hedges == 0
+
+    asyncio.run(main())
+
+
+def half_open_caller():
+    caller = ResilientCaller(5, CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    caller.breaker.record_failure()
+    caller.breaker.opened_at -= 60
+    return caller
+
+
+async def cancel_while_running(caller):
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(10)
+
+    call = asyncio.ensure_future(caller.call(hang))
+    await started.wait()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+
+def test_cancelled_call_is_not_a_failure():
+    async def main():
+        caller = ResilientCaller(5, CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        await cancel_while_running(caller)
+        assert caller.breaker.state == CLOSED and caller.breaker.failures == 0
+        assert caller.stats()['outcomes'] == {'success': 0, 'failure': 0, 'timeout': 0, 'rejected': 0}
+
+    asyncio.run(main())
+
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    async def main():
+        caller = half_open_caller()
+        await cancel_while_running(caller)
+        assert caller.breaker.state == HALF_OPEN
+        assert not caller.breaker.probing
+
+        async def send():
+            return response()
+
+        assert (await caller.call(send)).status_code == 200
+        assert caller.breaker.state == CLOSED
+
+    asyncio.run(main())
+
+
+def test_probe_raising_an_unexpected_error_reopens_the_breaker():
+    async def main():
+        caller = half_open_caller()
+
+        async def broken():
+            raise RuntimeError('bug')
+
+        with pytest.raises(RuntimeError):
+            await caller.call(broken)
+        assert caller.breaker.state == OPEN
+        assert not caller.breaker.probing
+
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Compare per-item cost of GET /api_a/{num} against POST /api_a/batch.
+
+Run from the repository root:
+
+    python scripts/bench_batch.py --requests 500 --batch-size 10000
+
+Both paths go through the full app (auth included) with FastAPI's TestClient and
+a scratch SQLite database. Timings are printed as JSON in microseconds per item.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{tempfile.mkdtemp()}/bench.db')
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core import config  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help='scalar requests to time')
+    parser.add_argument('--batch-size', type=int, default=10000, help='nums per batch request')
+    parser.add_argument('--batches', type=int, default=5, help='batch requests to time')
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        res = client.post('/token', data={'username': config.API_USERNAME, 'password': config.API_PASSWORD})
+        headers = {'Authorization': f'Bearer {res.json()["access_token"]}'}
+        client.get('/api_a/100', headers=headers)
+
+        start = time.perf_counter()
+        for num in range(args.requests):
+            client.get(f'/api_a/{num}', headers=headers)
+        scalar_us = (time.perf_counter() - start) / args.requests * 1e6
+
+        payload = {'nums': list(range(args.batch_size))}
+        start = time.perf_counter()
+        for _ in range(args.batches):
+            client.post('/api_a/batch', json=payload, headers=headers)
+        batch_us = (time.perf_counter() - start) / (args.batches * args.batch_size) * 1e6
+
+    report = {
+        'scalar_us_per_item': scalar_us,
+        'batch_us_per_item': batch_us,
+        'batch_size': args.batch_size,
+        'batch_cost_ratio': batch_us / scalar_us,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
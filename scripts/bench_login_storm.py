@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Measure /api_a latency while a storm of /token logins hits the same worker.
+
+Run from the repository root:
+
+    python scripts/bench_login_storm.py --duration 5 --pollers 20 --logins 20
+
+The app is served by a single uvicorn worker in a child process, so pollers and logins
+share one server event loop exactly like in production. `--inline` runs bcrypt on the
+event loop (the old behaviour) for comparison. Give the server at least
+`API_PASSWORD_HASH_WORKERS + 1` cores, otherwise bcrypt still competes with the
+event loop for CPU and the storm p99 cannot stay flat.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import auth, config  # noqa: E402
+from app.main import app  # noqa: E402
+from benchutil import free_port, percentile, start_server  # noqa: E402
+
+
+def serve(args):
+    if args.inline:
+
+        async def verify_inline(plain_password, hashed_password):
+            return auth.verify_password(plain_password, hashed_password)
+
+        auth.verify_password_async = verify_inline
+    uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning')
+
+
+async def login(client):
+    return await client.post(
+        '/token', data={'username': config.API_USERNAME, 'password': config.API_PASSWORD},
+    )
+
+
+async def poll(client, headers, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get('/api_a/100', headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def storm(client, deadline, statuses):
+    while time.perf_counter() < deadline:
+        res = await login(client)
+        statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+
+async def run_phase(client, headers, duration, pollers, logins):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    tasks = [poll(client, headers, deadline, latencies) for _ in range(pollers)]
+    tasks += [storm(client, deadline, statuses) for _ in range(logins)]
+    await asyncio.gather(*tasks)
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': statistics.mean(latencies) if latencies else None,
+        'login_statuses': statuses,
+    }
+
+
+async def main(args):
+    port = free_port()
+    cmd = [sys.executable, __file__, '--serve', '--port', str(port)] + (['--inline'] if args.inline else [])
+    server, base_url = start_server(cmd, port)
+    limits = httpx.Limits(max_connections=args.pollers + args.logins)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        token = (await login(client)).json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        report = {
+            'mode': 'inline' if args.inline else 'executor',
+            'password_hash_workers': config.API_PASSWORD_HASH_WORKERS,
+            'idle': await run_phase(client, headers, args.duration, args.pollers, 0),
+            'storm': await run_phase(client, headers, args.duration, args.pollers, args.logins),
+        }
+    server.terminate()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per phase')
+    parser.add_argument('--pollers', type=int, default=20, help='concurrent /api_a clients')
+    parser.add_argument('--logins', type=int, default=20, help='concurrent /token clients during the storm')
+    parser.add_argument('--inline', action='store_true', help='verify passwords on the event loop')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    serve(args) if args.serve else asyncio.run(main(args))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Measure the per-request overhead of MetricsMiddleware.
+
+Run from the repository root:
+
+    python scripts/bench_metrics.py --requests 20000 --rounds 5
+
+The app's ASGI stack is called directly (no sockets) for GET /ping and GET
+/api_a/{num}, alternating between the stack with and without the middleware. The
+median per-request time of each variant and the difference are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{tempfile.mkdtemp()}/bench.db')
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core import config  # noqa: E402
+from app.core.metrics import MetricsMiddleware  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def drive(path, headers, requests):
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': headers,
+        'client': ('127.0.0.1', 1234),
+        'server': ('127.0.0.1', 80),
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000, help='requests per round and variant')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        res = client.post('/token', data={'username': config.API_USERNAME, 'password': config.API_PASSWORD})
+        token = res.json()['access_token']
+    auth_headers = [(b'authorization', f'Bearer {token}'.encode())]
+
+    with_metrics = app.middleware_stack
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not MetricsMiddleware]
+    without_metrics = app.build_middleware_stack()
+
+    report = {}
+    for path, headers in (('/ping', []), ('/api_a/100', auth_headers)):
+        timings = {'with': [], 'without': []}
+        for _ in range(args.rounds):
+            for name, stack in (('with', with_metrics), ('without', without_metrics)):
+                app.middleware_stack = stack
+                timings[name].append(asyncio.run(drive(path, headers, args.requests)))
+        with_us, without_us = statistics.median(timings['with']), statistics.median(timings['without'])
+        report[path] = {
+            'with_metrics_us': with_us,
+            'without_metrics_us': without_us,
+            'overhead_us': with_us - without_us,
+            'overhead_pct': (with_us - without_us) / without_us * 100,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
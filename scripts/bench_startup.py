@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Measure cold start of the API: import time, startup hooks and first requests.
+
+Run from the repository root:
+
+    python scripts/bench_startup.py --runs 5
+
+Every run is a fresh interpreter against a scratch SQLite database. The `default`
+profile hashes the password on first use and always runs `create_all`; the `fast`
+profile passes a pre-hashed password and skips `create_all` once the schema
+fingerprint is stored. Median timings (ms) are printed as JSON.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from passlib.context import CryptContext
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CHILD = '''
+import json, time
+start = time.perf_counter()
+from app.main import app
+from app.core import config
+from fastapi.testclient import TestClient
+timings = {'import_ms': (time.perf_counter() - start) * 1000}
+
+start = time.perf_counter()
+with TestClient(app) as client:
+    timings['startup_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    res = client.post('/token', data={'username': config.API_USERNAME, 'password': config.API_PASSWORD})
+    timings['first_login_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    client.get('/api_a/100', headers={'Authorization': 'Bearer ' + res.json()['access_token']})
+    timings['first_request_ms'] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+'''
+
+
+def run_profile(env, runs):
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(env, DATABASE_URL=f'sqlite:///{tmp}/bench.db')
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, '-c', CHILD], cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per profile')
+    args = parser.parse_args()
+
+    password = os.environ.get('API_PASSWORD', 'debian')
+    base_env = dict(os.environ, API_PASSWORD=password)
+    fast_env = dict(
+        base_env,
+        API_PASSWORD_HASH=CryptContext(schemes=['bcrypt']).hash(password),
+        DB_SKIP_UNCHANGED_SCHEMA='true',
+    )
+    report = {
+        'runs': args.runs,
+        'default': run_profile(base_env, args.runs),
+        'fast': run_profile(fast_env, args.runs),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
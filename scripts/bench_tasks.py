@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Compare POST /task/ throughput on the async engine against the old sync handler.
+
+Run from the repository root:
+
+    python scripts/bench_tasks.py --clients 100 --duration 10
+
+A single uvicorn worker serves the app plus `/bench/task-sync/`, a copy of the
+previous sync handler running on the threadpool with a sync Session. Both paths are
+hammered by the same number of concurrent clients and the results are printed as
+JSON. `DATABASE_URL` selects the database (a scratch SQLite file by default).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchutil import free_port, start_server, summarize  # noqa: E402
+
+
+def serve(args):
+    from fastapi import Depends
+    from sqlmodel import Session
+
+    from app.db import engine
+    from app.main import app
+    from app.models import Task, TaskCreate
+
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    @app.post('/bench/task-sync/', response_model=Task)
+    def create_task_sync(task: TaskCreate, session: Session = Depends(get_session)):
+        db_task = Task.from_orm(task)
+        session.add(db_task)
+        session.commit()
+        session.refresh(db_task)
+        return db_task
+
+    uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning')
+
+
+async def client_loop(client, path, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            res = await client.post(path, json={'task_name': 'bench'})
+            ok = res.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors.append(1)
+
+
+async def run_path(base_url, path, clients, duration):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*[client_loop(client, path, deadline, latencies, errors) for _ in range(clients)])
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, len(errors))
+
+
+def main(args):
+    env = dict(os.environ)
+    scratch = tempfile.TemporaryDirectory()
+    env.setdefault('DATABASE_URL', f'sqlite:///{scratch.name}/bench.db')
+    port = free_port()
+    server, base_url = start_server([sys.executable, __file__, '--serve', '--port', str(port)], port, env=env)
+    try:
+        report = {
+            'clients': args.clients,
+            'duration_s': args.duration,
+            'async': asyncio.run(run_path(base_url, '/task/', args.clients, args.duration)),
+            'sync': asyncio.run(run_path(base_url, '/bench/task-sync/', args.clients, args.duration)),
+        }
+    finally:
+        server.terminate()
+        scratch.cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=100, help='concurrent clients per path')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per path')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    serve(args) if args.serve else main(args)
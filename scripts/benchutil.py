@@ -0,0 +1,53 @@
+"""Shared helpers for the benchmark scripts in this folder."""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies_ms, elapsed_s, errors=0):
+    return {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'throughput_rps': len(latencies_ms) / elapsed_s if elapsed_s else None,
+        'p50_ms': percentile(latencies_ms, 50),
+        'p95_ms': percentile(latencies_ms, 95),
+        'p99_ms': percentile(latencies_ms, 99),
+        'mean_ms': statistics.mean(latencies_ms) if latencies_ms else None,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(cmd, port, health_path='/ping', env=None, timeout=30):
+    """Start `cmd` as a child process and wait until `health_path` answers."""
+    server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, cwd=ROOT, env=env)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            httpx.get(base_url + health_path)
+            return server, base_url
+        except httpx.TransportError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                server.kill()
+                sys.exit(f'server did not start: {" ".join(cmd)}')
+            time.sleep(0.05)
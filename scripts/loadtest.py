@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""Run a load-test scenario against the movie and cast services and report latency and throughput as JSON.
+
+Start both services locally (no network access needed beyond localhost), e.g.:
+
+    cd cast-service && DATABASE_URI=postgresql://localhost/cast_db uvicorn app.main:app --port 8002
+    cd movie-service && DATABASE_URI=postgresql://localhost/movie_db \\
+        CAST_SERVICE_HOST_URL=http://127.0.0.1:8002/api/v1/casts/ uvicorn app.main:app --port 8001
+
+or `docker-compose -f docker-compose.ms.yml up`, then from the repository root:
+
+    python scripts/loadtest.py scripts/scenarios/ms_mixed.json --output run.json
+    python scripts/loadtest.py scripts/scenarios/ms_mixed.json --baseline run.json
+
+A scenario is a JSON object:
+
+    {
+      "name": "...",
+      "targets": {"movies": "http://127.0.0.1:8001", "casts": "http://127.0.0.1:8002"},
+      "concurrency": 50,            # closed-loop workers
+      "duration": 30,               # measured seconds
+      "warmup": 2,                  # seconds run before measuring
+      "setup": [                    # run once, in order, before the load
+        {"method": "POST", "target": "casts", "path": "/api/v1/casts/", "json": {"name": "x"},
+         "repeat": 20, "capture": {"cast_id": "id"}}
+      ],
+      "requests": [                 # picked at random by weight for every call
+        {"name": "get cast", "weight": 80, "method": "GET", "target": "casts", "path": "/api/v1/casts/{cast_id}/"}
+      ]
+    }
+
+`capture` appends a field of each setup response to a named list. A `{name}` in a path,
+query string, or a JSON string value that is exactly "{name}" is replaced by a random
+member of that list. Responses are errors when their status is not listed in `expect`
+(default: any 2xx or 3xx) or the request fails. --concurrency and --duration override
+the scenario.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchutil import summarize  # noqa: E402
+
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+def render(value, variables, rng):
+    if isinstance(value, str):
+        whole = PLACEHOLDER.fullmatch(value)
+        if whole and whole.group(1) in variables:
+            return rng.choice(variables[whole.group(1)])
+        return PLACEHOLDER.sub(lambda m: str(rng.choice(variables[m.group(1)])), value)
+    if isinstance(value, list):
+        return [render(item, variables, rng) for item in value]
+    if isinstance(value, dict):
+        return {key: render(item, variables, rng) for key, item in value.items()}
+    return value
+
+
+async def send(clients, spec, variables, rng):
+    kwargs = {'params': render(spec['params'], variables, rng)} if 'params' in spec else {}
+    if 'json' in spec:
+        kwargs['json'] = render(spec['json'], variables, rng)
+    return await clients[spec['target']].request(spec['method'], render(spec['path'], variables, rng), **kwargs)
+
+
+def is_ok(spec, status):
+    return status in spec['expect'] if 'expect' in spec else 200 <= status < 400
+
+
+async def run_setup(clients, scenario, rng):
+    variables = defaultdict(list)
+    for spec in scenario.get('setup', []):
+        for _ in range(spec.get('repeat', 1)):
+            response = await send(clients, spec, variables, rng)
+            if not is_ok(spec, response.status_code):
+                sys.exit(f'setup request {spec["method"]} {spec["path"]} failed: {response.status_code} {response.text}')
+            for name, field in spec.get('capture', {}).items():
+                variables[name].append(response.json()[field])
+    return variables
+
+
+async def run(scenario, seed):
+    limits = httpx.Limits(max_connections=scenario['concurrency'])
+    clients = {
+        name: httpx.AsyncClient(base_url=url, limits=limits, timeout=scenario.get('timeout', 30))
+        for name, url in scenario['targets'].items()
+    }
+    rng = random.Random(seed)
+    try:
+        variables = await run_setup(clients, scenario, rng)
+        requests = scenario['requests']
+        names = [spec.get('name', f'{spec["method"]} {spec["path"]}') for spec in requests]
+        weights = [spec.get('weight', 1) for spec in requests]
+        latencies = defaultdict(list)
+        errors = Counter()
+        statuses = Counter()
+        measuring = False
+
+        async def worker(deadline):
+            while time.perf_counter() < deadline:
+                [index] = rng.choices(range(len(requests)), weights=weights)
+                start = time.perf_counter()
+                try:
+                    response = await send(clients, requests[index], variables, rng)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if not measuring:
+                    continue
+                statuses[str(status)] += 1
+                if isinstance(status, int) and is_ok(requests[index], status):
+                    latencies[names[index]].append(elapsed_ms)
+                else:
+                    errors[names[index]] += 1
+
+        concurrency = scenario['concurrency']
+        if scenario.get('warmup'):
+            await asyncio.gather(*(worker(time.perf_counter() + scenario['warmup']) for _ in range(concurrency)))
+        measuring = True
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(start + scenario['duration']) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+    def with_error_rate(summary):
+        total = summary['requests'] + summary['errors']
+        return {**summary, 'error_rate': summary['errors'] / total if total else 0.0}
+
+    everything = [latency for name in names for latency in latencies[name]]
+    return {
+        'scenario': scenario.get('name'),
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'total': with_error_rate(summarize(everything, elapsed, sum(errors.values()))),
+        'requests': {
+            name: with_error_rate(summarize(latencies[name], elapsed, errors[name])) for name in dict.fromkeys(names)
+        },
+        'status_codes': dict(statuses),
+    }
+
+
+def compare(report, baseline):
+    def ratios(new, old):
+        return {
+            key: new[key] / old[key] if new.get(key) is not None and old.get(key) else None
+            for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms')
+        }
+
+    return {
+        'total': ratios(report['total'], baseline['total']),
+        'requests': {
+            name: ratios(summary, baseline['requests'][name])
+            for name, summary in report['requests'].items()
+            if name in baseline['requests']
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenario', help='scenario JSON file')
+    parser.add_argument('--concurrency', type=int)
+    parser.add_argument('--duration', type=float)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='also write the report to this file')
+    parser.add_argument('--baseline', help='earlier report to compare against (new / old ratios)')
+    args = parser.parse_args()
+
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+    for key in ('concurrency', 'duration'):
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+
+    report = asyncio.run(run(scenario, args.seed))
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['vs_baseline'] = compare(report, json.load(f))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()